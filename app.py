@@ -5,6 +5,8 @@ from eth_account.messages import encode_defunct
 import os
 import secrets
 import time
+import datetime
+import uuid
 from flask_cors import CORS
 import re
 from werkzeug.utils import secure_filename
@@ -13,6 +15,12 @@ from dotenv import load_dotenv
 import hashlib
 import random
 from unidecode import unidecode
+import db
+import pagination
+import counts
+import catalog
+import project_cache
+import rpc
 
 app = Flask(__name__)
 CORS(app)
@@ -28,16 +36,15 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+db.init_app(app)
+counts.init_app(app)
+catalog.init_app(app)
+project_cache.init_app(app)
+
 def get_db_connection():
-   return psycopg2.connect(
-   dbname=DB_NAME,
-   user=DB_USER,
-   password=DB_PASSWORD,
-   host=DB_HOST,
-   port=DB_PORT
-   )
+   return db.get_db_connection()
 
-w3 = Web3(Web3.HTTPProvider('https://evm-rpc-arctic-1.sei-apis.com'))
+w3 = rpc.get_web3()
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -213,110 +220,73 @@ def invest():
 @app.route("/api/get-projects")
 def get_projects():
    investor_wallet_address = session.get('investor_wallet_address')
-   page = request.args.get('page', 1, type=int)
-   per_page = request.args.get('per_page', 5, type=int)
    project_type = request.args.get('type', "active", type=str)  # active, completed, invested
-   offset = (page - 1) * per_page
+   approximate = request.args.get('approximate', 'false') == 'true'
+   try:
+      page_args = pagination.get_page_args()
+   except pagination.InvalidCursor:
+      return jsonify({"success": False, "message": "Invalid cursor"}), 400
+   page = page_args["page"]
+   per_page = page_args["per_page"]
+   keyset, keyset_params = pagination.keyset_sql(page_args, "p.created_time", "p.id")
+   limit, limit_params = pagination.limit_sql(page_args)
    
    if project_type == 'invested' and not investor_wallet_address:
       return jsonify({"success": False, "message": "Investor not connected"}), 401
    
    try:
-      conn = get_db_connection()
-      cur = conn.cursor()
-      
       projects = []
       total_count = 0
       
-      if project_type == 'invested':
-         cur.execute("""
-            SELECT COUNT(DISTINCT p.id) 
-            FROM project p
-            JOIN transaction i ON p.id = i.project_id
-            WHERE i.investor_address = %s
-         """, (investor_wallet_address,))
-         total_count = cur.fetchone()[0]
+      if project_type in ('active', 'completed'):
+         # Public tabs are served from the in-memory catalog, no query per visitor
+         statuses = ('raising', 'voting') if project_type == 'active' else ('completed', 'failed')
+         projects, total_count, next_cursor = catalog.list_projects(statuses, page_args)
+      elif project_type == 'invested':
+         conn = get_db_connection()
+         cur = conn.cursor()
+
+         total_count = counts.get_count(cur, "projects:invested", investor_wallet_address, """
+            FROM investor_position
+            WHERE investor_address = %s
+         """, (investor_wallet_address,), approximate=approximate)
          
-         cur.execute("""
-            SELECT DISTINCT p.id, p.name, p.funding_status, 
+         cur.execute(f"""
+            SELECT p.id, p.name, p.funding_status, 
                    p.fund_raised, p.investment_end_time,
                    CONCAT(r.first_name, ' ', r.last_name) AS raiser_name, 
                    p.logo_url,
                    p.created_time
-            FROM project p
-            JOIN transaction i ON p.id = i.project_id
+            FROM investor_position ip
+            JOIN project p ON p.id = ip.project_id
             JOIN raiser r ON p.raiser_id = r.id
-            WHERE i.investor_address = %s
-            ORDER BY p.created_time DESC
-            LIMIT %s OFFSET %s
-         """, (investor_wallet_address, per_page, offset))
+            WHERE ip.investor_address = %s
+            {keyset}
+            ORDER BY p.created_time DESC, p.id DESC
+            {limit}
+         """, [investor_wallet_address] + keyset_params + limit_params)
       
-      elif project_type == 'active':
-         cur.execute("""
-               SELECT COUNT(*) FROM project 
-               WHERE funding_status IN ('raising', 'voting')
-               AND listing_status = 'accepted'
-               AND hidden = FALSE
-            """)
-         total_count = cur.fetchone()[0]
-         
-         cur.execute("""
-            SELECT p.id, p.name, p.funding_status, 
-                  p.fund_raised, p.investment_end_time,
-                  CONCAT(r.first_name, ' ', r.last_name) AS raiser_name,
-                  p.logo_url
-            FROM project p
-            JOIN raiser r ON p.raiser_id = r.id
-            WHERE p.funding_status IN ('raising', 'voting')
-            AND p.listing_status = 'accepted'
-            AND p.hidden = FALSE
-            ORDER BY p.created_time DESC
-            LIMIT %s OFFSET %s
-         """, (per_page, offset))
-      
-      elif project_type == 'completed':
-         cur.execute("""
-               SELECT COUNT(*) FROM project 
-               WHERE funding_status = 'completed'
-               AND listing_status = 'accepted'
-               AND hidden = FALSE
-            """)
-         total_count = cur.fetchone()[0]
+         rows, next_cursor = pagination.split_page(cur.fetchall(), page_args, lambda row: (row[7], row[0]))
+         for row in rows:
+            project_data = {
+               "id": row[0],
+               "name": row[1],
+               "funding_status": row[2],
+               "fund_raised": row[3],
+               "investment_end_time": row[4],
+               "raiser_name": row[5],
+               "logo_url": row[6]
+            }
+            
+            projects.append(project_data)
          
-         cur.execute("""
-            SELECT p.id, p.name, p.funding_status, 
-                  p.fund_raised, p.investment_end_time,
-                  CONCAT(r.first_name, ' ', r.last_name) AS raiser_name,
-                  p.logo_url
-            FROM project p
-            JOIN raiser r ON p.raiser_id = r.id
-            WHERE p.funding_status IN ('completed', 'failed')
-            AND p.listing_status = 'accepted'
-            AND p.hidden = FALSE
-            ORDER BY p.created_time DESC
-            LIMIT %s OFFSET %s
-         """, (per_page, offset))
+         cur.close()
+         conn.close()
       else:
          return jsonify({"success": False, "message": "Invalid project type"}), 400
       
-      for row in cur.fetchall():
-         project_data = {
-            "id": row[0],
-            "name": row[1],
-            "funding_status": row[2],
-            "fund_raised": row[3],
-            "investment_end_time": row[4],
-            "raiser_name": row[5],
-            "logo_url": row[6]
-         }
-         
-         projects.append(project_data)
-      
       total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
       
-      cur.close()
-      conn.close()
-      
       return jsonify({
          "success": True,
          "projects": projects,
@@ -324,7 +294,8 @@ def get_projects():
             "total_count": total_count,
             "total_pages": total_pages,
             "current_page": page,
-            "per_page": per_page
+            "per_page": per_page,
+            "next_cursor": next_cursor
          }
       })
       
@@ -643,10 +614,12 @@ def investor_connect():
          cur.execute("SELECT id FROM investor WHERE wallet_address = %s", (session['investor_wallet_address'],))
          exist = cur.fetchone()
          if not exist:
-            cur.execute("INSERT INTO investor(wallet_address) VALUES (%s)", (session['investor_wallet_address'],))
+            cur.execute("INSERT INTO investor(wallet_address) VALUES (%s) RETURNING id", (session['investor_wallet_address'],))
+            exist = cur.fetchone()
             conn.commit()
             cur.close()
             conn.close()
+         session['investor_id'] = str(exist[0])
          return jsonify({"success": True, "message": "Connect wallet successfully!"}), 200
       except psycopg2.Error as e:
          print(f"Database error: {e}")
@@ -743,10 +716,16 @@ def profile(raiser_id_param):
 
 @app.route("/api/get-raiser-projects")
 def api_get_raiser_projects():
-   page = request.args.get('page', 1, type=int)
-   per_page = request.args.get('per_page', 5, type=int)
-   offset = (page - 1) * per_page
+   try:
+      page_args = pagination.get_page_args()
+   except pagination.InvalidCursor:
+      return jsonify({"success": False, "message": "Invalid cursor"}), 400
+   page = page_args["page"]
+   per_page = page_args["per_page"]
+   keyset, keyset_params = pagination.keyset_sql(page_args, "created_time", "id")
+   limit, limit_params = pagination.limit_sql(page_args)
    raiser_username = request.args.get('raiser_username', '', type=str)
+   approximate = request.args.get('approximate', 'false') == 'true'
    
    if raiser_username == '':
       return jsonify({"success": False, "message": "Missing raiser username"}), 500
@@ -763,21 +742,23 @@ def api_get_raiser_projects():
          return jsonify({"success": False, "message": "Raiser not found"}), 500
       raiser_id = user_data[0]
 
-      cur.execute("SELECT COUNT(*) FROM project WHERE raiser_id = %s AND listing_status = 'accepted' AND hidden = FALSE", 
-                  (raiser_id,))
-      total_count = cur.fetchone()[0]
+      total_count = counts.get_count(cur, "raiser_projects", raiser_id,
+                  "FROM project WHERE raiser_id = %s AND listing_status = 'accepted' AND hidden = FALSE",
+                  (raiser_id,), approximate=approximate)
       total_pages = (total_count + per_page - 1) // per_page
       
-      cur.execute("""
-         SELECT id, name, funding_status, fund_raised, investment_end_time, logo_url
+      cur.execute(f"""
+         SELECT id, name, funding_status, fund_raised, investment_end_time, logo_url, created_time
          FROM project 
          WHERE raiser_id = %s AND listing_status = 'accepted' AND hidden = FALSE
-         ORDER BY created_time DESC
-         LIMIT %s OFFSET %s
-      """, (raiser_id, per_page, offset))
+         {keyset}
+         ORDER BY created_time DESC, id DESC
+         {limit}
+      """, [raiser_id] + keyset_params + limit_params)
       
+      rows, next_cursor = pagination.split_page(cur.fetchall(), page_args, lambda row: (row[6], row[0]))
       projects = []
-      for row in cur.fetchall():
+      for row in rows:
          projects.append({
                "id": row[0],
                "name": row[1],
@@ -797,7 +778,8 @@ def api_get_raiser_projects():
                "total_count": total_count,
                "total_pages": total_pages,
                "current_page": page,
-               "per_page": per_page
+               "per_page": per_page,
+               "next_cursor": next_cursor
          }
       })
       
@@ -808,6 +790,7 @@ def api_get_raiser_projects():
 @app.route('/disconnect')
 def disconnect():
     session.pop('investor_wallet_address', None)
+    session.pop('investor_id', None)
     return redirect(request.referrer)
 
 @app.errorhandler(404)
@@ -834,62 +817,35 @@ def project(project_id):
         raiser_logged_in = False
         raiser_id = ""
 
+    try:
+        project_id = int(project_id)
+    except ValueError:
+        return redirect("/not-found")
+
     try:
         conn = get_db_connection()
         cur = conn.cursor()
         
-        cur.execute("""
-            SELECT p.id, p.name, p.token_name, p.token_symbol, p.logo_url, p.investment_end_time, 
-            p.funding_status, p.total_token_supply, p.token_to_sell, p.token_price, p.token_address, 
-            p.fund_raised, p.token_sold, p.decimal, p.vote_for_refund, 
-            p.x_link, p.website_link, p.telegram_link, p.whitepaper_link, p.description, 
-            CONCAT(r.first_name, ' ', r.last_name) AS raiser_name, r.username
-            FROM project p
-            JOIN raiser r ON p.raiser_id = r.id
-            WHERE p.id = %s AND p.listing_status = 'accepted'
-        """, (project_id,))
-        
-        project = cur.fetchone()
-        if not project:
+        # Shared part of the page comes from the per-worker cache; only the
+        # viewer's like is looked up per request.
+        cached = project_cache.get_project_detail(cur, project_id)
+        if not cached:
             return redirect("/not-found")
         
-        cur.execute("SELECT COUNT(*) FROM project_like WHERE project_id = %s", (project_id,))
-        like_count = cur.fetchone()[0]
         liked = False
         if investor_connected:
-           cur.execute("SELECT id FROM investor WHERE wallet_address = %s", (session.get('investor_wallet_address'),))
-           investor = cur.fetchone()
-           investor_id = investor[0]
-           cur.execute("SELECT id FROM project_like WHERE project_id = %s AND investor_id = %s", 
-                    (project_id, investor_id))
-           liked = cur.fetchone()
-
-        project_data = {
-            "id": project[0],
-            "name": project[1],
-            "token_name": project[2],
-            "token_symbol": project[3],
-            "logo_url": project[4],
-            "end_time": project[5],
-            "total_token_supply": project[7],
-            "funding_status": project[6],
-            "token_to_sell": project[8],
-            "token_price": float(project[9]),
-            "token_address": project[10],
-            "fund_raised": project[11],
-            "token_sold": project[12],
-            "description": project[19],
-            "decimal": project[13],
-            "vote_for_refund": project[14],
-            "x_link": project[15],
-            "website_link": project[16],
-            "telegram_link": project[17],
-            "whitepaper_link": project[18],
-            "raiser_name": project[20],
-            "raiser_username": project[21],
-            "like_count": like_count,
-            "isLiked": bool(liked)
-        }
+           investor_id = session.get('investor_id')
+           if not investor_id:
+              cur.execute("SELECT id FROM investor WHERE wallet_address = %s", (investor_wallet_address,))
+              investor = cur.fetchone()
+              investor_id = str(investor[0]) if investor else None
+              session['investor_id'] = investor_id
+           if investor_id:
+              cur.execute("SELECT 1 FROM project_like WHERE project_id = %s AND investor_id = %s", 
+                       (project_id, investor_id))
+              liked = cur.fetchone()
+
+        project_data = dict(cached, isLiked=bool(liked))
 
         cur.close()
         conn.close()
@@ -1176,30 +1132,38 @@ def api_submitted_projects():
    if 'raiser_id' not in session:
       return jsonify({"success": False, "message": "Not logged in"}), 401
    
-   page = request.args.get('page', 1, type=int)
-   per_page = request.args.get('per_page', 5, type=int)
-   offset = (page - 1) * per_page
+   approximate = request.args.get('approximate', 'false') == 'true'
+   try:
+      page_args = pagination.get_page_args()
+   except pagination.InvalidCursor:
+      return jsonify({"success": False, "message": "Invalid cursor"}), 400
+   page = page_args["page"]
+   per_page = page_args["per_page"]
+   keyset, keyset_params = pagination.keyset_sql(page_args, "created_time", "id")
+   limit, limit_params = pagination.limit_sql(page_args)
    
    try:
       conn = get_db_connection()
       cur = conn.cursor()
       
-      cur.execute("SELECT COUNT(*) FROM project WHERE raiser_id = %s", 
-                  (session['raiser_id'],))
-      total_count = cur.fetchone()[0]
+      total_count = counts.get_count(cur, "submitted_projects", session['raiser_id'],
+                  "FROM project WHERE raiser_id = %s",
+                  (session['raiser_id'],), approximate=approximate)
       total_pages = (total_count + per_page - 1) // per_page
       
-      cur.execute("""
-         SELECT id, name, listing_status, funding_status, platform_comment, logo_url
+      cur.execute(f"""
+         SELECT id, name, listing_status, funding_status, platform_comment, logo_url, created_time
          FROM project 
          WHERE raiser_id = %s
-         ORDER BY created_time DESC
-         LIMIT %s OFFSET %s
-      """, (session['raiser_id'], per_page, offset))
+         {keyset}
+         ORDER BY created_time DESC, id DESC
+         {limit}
+      """, [session['raiser_id']] + keyset_params + limit_params)
       
+      rows, next_cursor = pagination.split_page(cur.fetchall(), page_args, lambda row: (row[6], row[0]))
       projects = []
-      for row in cur.fetchall():
-         project_id, name, listing_status, funding_status, platform_comment, logo_url = row
+      for row in rows:
+         project_id, name, listing_status, funding_status, platform_comment, logo_url, _ = row
          projects.append({
                "id": project_id,
                "name": name,
@@ -1219,7 +1183,8 @@ def api_submitted_projects():
                "total_count": total_count,
                "total_pages": total_pages,
                "current_page": page,
-               "per_page": per_page
+               "per_page": per_page,
+               "next_cursor": next_cursor
          }
       })
       
@@ -1294,37 +1259,52 @@ def toggle_like_project():
         conn = get_db_connection()
         cur = conn.cursor()
 
-        cur.execute("SELECT id FROM project WHERE id = %s AND hidden = FALSE", (project_id,))
-        project = cur.fetchone()
-        if not project:
+        # Like or unlike in one statement; project.like_count is kept in sync
+        # by the project_like trigger, the returned count is derived from it.
+        cur.execute("""
+            WITH proj AS (
+                SELECT id, like_count FROM project WHERE id = %(project_id)s AND hidden = FALSE
+            ),
+            inv AS (
+                SELECT id FROM investor WHERE wallet_address = %(wallet_address)s
+            ),
+            removed AS (
+                DELETE FROM project_like l
+                USING proj, inv
+                WHERE l.project_id = proj.id AND l.investor_id = inv.id
+                RETURNING l.id
+            ),
+            added AS (
+                INSERT INTO project_like (project_id, investor_id)
+                SELECT proj.id, inv.id FROM proj, inv
+                WHERE NOT EXISTS (SELECT 1 FROM removed)
+                ON CONFLICT (project_id, investor_id) DO NOTHING
+                RETURNING id
+            )
+            SELECT EXISTS (SELECT 1 FROM proj),
+                   EXISTS (SELECT 1 FROM inv),
+                   NOT EXISTS (SELECT 1 FROM removed),
+                   (SELECT like_count FROM proj) + (SELECT COUNT(*) FROM added) - (SELECT COUNT(*) FROM removed)
+        """, {"project_id": project_id, "wallet_address": investor_wallet_address})
+        project_found, investor_found, liked, like_count = cur.fetchone()
+
+        if not project_found:
             cur.close()
             conn.close()
             return jsonify({"success": False, "message": "Project not found"}), 404
 
-        cur.execute("SELECT id FROM investor WHERE wallet_address = %s", (investor_wallet_address,))
-        investor = cur.fetchone()
-        if not investor:
+        if not investor_found:
             cur.close()
             conn.close()
             return jsonify({"success": False, "message": "Investor not found"}), 404
 
-        investor_id = investor[0]
-
-        cur.execute("SELECT id FROM project_like WHERE project_id = %s AND investor_id = %s", (project_id, investor_id))
-        like = cur.fetchone()
-
-        if like:
-            cur.execute("DELETE FROM project_like WHERE project_id = %s AND investor_id = %s", (project_id, investor_id))
-            conn.commit()
-            cur.close()
-            conn.close()
-            return jsonify({"success": True, "message": "Project disliked successfully"}), 200
+        conn.commit()
+        cur.close()
+        conn.close()
+        if liked:
+            return jsonify({"success": True, "message": "Project liked successfully", "liked": True, "like_count": like_count}), 201
         else:
-            cur.execute("INSERT INTO project_like (project_id, investor_id) VALUES (%s, %s)", (project_id, investor_id))
-            conn.commit()
-            cur.close()
-            conn.close()
-            return jsonify({"success": True, "message": "Project liked successfully"}), 201
+            return jsonify({"success": True, "message": "Project disliked successfully", "liked": False, "like_count": like_count}), 200
     except psycopg2.Error as e:
         print(f"Database error: {e}")
         return jsonify({"success": False, "message": "An error occurred"}), 500
@@ -1335,36 +1315,41 @@ def get_transactions():
         return jsonify({"success": False, "message": "Investor not connected"}), 401
 
     investor_wallet_address = session.get('investor_wallet_address')
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 5, type=int)
-    offset = (page - 1) * per_page
+    approximate = request.args.get('approximate', 'false') == 'true'
+    try:
+        page_args = pagination.get_page_args(id_type=uuid.UUID)
+    except pagination.InvalidCursor:
+        return jsonify({"success": False, "message": "Invalid cursor"}), 400
+    page = page_args["page"]
+    per_page = page_args["per_page"]
+    keyset, keyset_params = pagination.keyset_sql(page_args, "t.transaction_time", "t.id")
+    limit, limit_params = pagination.limit_sql(page_args)
 
     try:
         conn = get_db_connection()
         cur = conn.cursor()
 
-        cur.execute("""
-            SELECT COUNT(*) 
+        total_count = counts.get_count(cur, "transactions", investor_wallet_address, """
             FROM transaction 
             WHERE investor_address = %s
-        """, (investor_wallet_address,))
-        
-        total_count = cur.fetchone()[0]
+        """, (investor_wallet_address,), approximate=approximate)
         total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
 
-        cur.execute("""
+        cur.execute(f"""
             SELECT t.id, t.project_id, t.amount, t.token_received, 
                    t.transaction_time, t.transaction_hash, t.type,
                    p.name AS project_name, p.token_symbol
             FROM transaction t
             JOIN project p ON t.project_id = p.id
             WHERE t.investor_address = %s
-            ORDER BY t.transaction_time DESC
-            LIMIT %s OFFSET %s
-        """, (investor_wallet_address, per_page, offset))
+            {keyset}
+            ORDER BY t.transaction_time DESC, t.id DESC
+            {limit}
+        """, [investor_wallet_address] + keyset_params + limit_params)
 
+        rows, next_cursor = pagination.split_page(cur.fetchall(), page_args, lambda row: (row[4], row[0]))
         transactions = []
-        for row in cur.fetchall():
+        for row in rows:
             transactions.append({
                 "id": str(row[0]),
                 "project_id": row[1],
@@ -1387,7 +1372,8 @@ def get_transactions():
                 "total_count": total_count,
                 "total_pages": total_pages,
                 "current_page": page,
-                "per_page": per_page
+                "per_page": per_page,
+                "next_cursor": next_cursor
             }
         })
 
@@ -1417,65 +1403,121 @@ def blog():
    
    return render_template("blog.html", nonce=nonce, investor_connected=investor_connected, investor_wallet_address=investor_wallet_address, raiser_logged_in=raiser_logged_in, raiser_id=raiser_id, query=query)
 
+MIN_FULL_TEXT_QUERY_LENGTH = 3
+
 @app.route("/api/blog/posts")
 def get_blog_posts():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 5, type=int)
     query = request.args.get('query', '')
-    offset = (page - 1) * per_page
+    approximate = request.args.get('approximate', 'false') == 'true'
+    try:
+        # Full-text results are paged on (rank, id), listings on (created_time, id)
+        page_args = pagination.get_page_args(sort_type=None)
+    except pagination.InvalidCursor:
+        return jsonify({"success": False, "message": "Invalid cursor"}), 400
+    page = page_args["page"]
+    per_page = page_args["per_page"]
+    limit, limit_params = pagination.limit_sql(page_args)
     
     try:
         conn = get_db_connection()
         cur = conn.cursor()
         
-        # Build the query based on whether we're searching or just listing
-        if query:
-            search_query = f"%{query}%"
-            count_sql = """
-                SELECT COUNT(*) FROM post 
+        # Build the query based on whether we're searching or just listing.
+        # Rows are (id, title, excerpt, reading_time, first_image_url, created_time,
+        # thumbnail_url, sort_key, snippet); post bodies are only read by blog_post()
+        query = query.strip()
+        total_count = 0
+        if len(query) >= MIN_FULL_TEXT_QUERY_LENGTH:
+            # Ranked full-text search, paged on (rank, id)
+            total_count = counts.get_count(cur, "blog", "fts:" + query.lower(), """
+                FROM post 
                 WHERE status = 'posted' 
-                AND (title ILIKE %s OR content ILIKE %s)
+                AND search_vector @@ websearch_to_tsquery('english', %s)
+            """, (query,), approximate=approximate)
+
+        if page_args["cursor"] is not None:
+            try:
+                page_args["cursor"] = pagination.check_cursor(
+                    page_args["cursor"], float if total_count else datetime.datetime, uuid.UUID)
+            except pagination.InvalidCursor:
+                cur.close()
+                conn.close()
+                return jsonify({"success": False, "message": "Invalid cursor"}), 400
+        keyset, keyset_params = pagination.keyset_sql(page_args, "created_time", "id")
+
+        if total_count:
+            rank_keyset = ""
+            if page_args["cursor"] is not None:
+                # ts_rank() is real: compare against a real, not the float8 the
+                # cursor's rank would otherwise be read as, or the boundary row
+                # and its ties are repeated or skipped
+                rank_keyset = "AND (ts_rank(search_vector, websearch_to_tsquery('english', %s)), id) < (%s::real, %s)"
+                keyset_params = [query] + keyset_params
+            posts_sql = f"""
+                SELECT id, title, excerpt, reading_time, first_image_url, created_time, thumbnail_url, rank,
+                       ts_headline('english', regexp_replace(content, '<[^>]*>', ' ', 'g'),
+                                   websearch_to_tsquery('english', %s),
+                                   'MaxFragments=2, MaxWords=30, MinWords=10')
+                FROM (
+                    SELECT id, title, excerpt, reading_time, first_image_url, created_time, thumbnail_url, content,
+                           ts_rank(search_vector, websearch_to_tsquery('english', %s)) AS rank
+                    FROM post 
+                    WHERE status = 'posted' 
+                    AND search_vector @@ websearch_to_tsquery('english', %s)
+                    {rank_keyset}
+                    ORDER BY rank DESC, id DESC
+                    {limit}
+                ) page
+                ORDER BY rank DESC, id DESC
             """
-            cur.execute(count_sql, (search_query, search_query))
-            
-            total_count_result = cur.fetchone()
-            total_count = total_count_result[0] if total_count_result else 0
+            cur.execute(posts_sql, [query, query, query] + keyset_params + limit_params)
+        elif query:
+            # Short or partial words: substring match on titles (trigram index)
+            search_query = f"%{query}%"
+            total_count = counts.get_count(cur, "blog", "title:" + query.lower(), """
+                FROM post 
+                WHERE status = 'posted' 
+                AND title ILIKE %s
+            """, (search_query,), approximate=approximate)
             
-            posts_sql = """
-                SELECT id, title, content, created_time, thumbnail_url 
+            posts_sql = f"""
+                SELECT id, title, excerpt, reading_time, first_image_url, created_time, thumbnail_url, created_time, NULL
                 FROM post 
                 WHERE status = 'posted' 
-                AND (title ILIKE %s OR content ILIKE %s)
-                ORDER BY created_time DESC
-                LIMIT %s OFFSET %s
+                AND title ILIKE %s
+                {keyset}
+                ORDER BY created_time DESC, id DESC
+                {limit}
             """
-            cur.execute(posts_sql, (search_query, search_query, per_page, offset))
+            cur.execute(posts_sql, [search_query] + keyset_params + limit_params)
         else:
-            count_sql = "SELECT COUNT(*) FROM post WHERE status = 'posted'"
-            cur.execute(count_sql)
+            total_count = counts.get_count(cur, "blog", None, "FROM post WHERE status = 'posted'",
+                                           approximate=approximate)
             
-            total_count_result = cur.fetchone()
-            total_count = total_count_result[0] if total_count_result else 0
-            
-            posts_sql = """
-                SELECT id, title, content, created_time, thumbnail_url 
+            posts_sql = f"""
+                SELECT id, title, excerpt, reading_time, first_image_url, created_time, thumbnail_url, created_time, NULL
                 FROM post 
                 WHERE status = 'posted'
-                ORDER BY created_time DESC
-                LIMIT %s OFFSET %s
+                {keyset}
+                ORDER BY created_time DESC, id DESC
+                {limit}
             """
-            cur.execute(posts_sql, (per_page, offset))
+            cur.execute(posts_sql, keyset_params + limit_params)
         
         # Get the posts
+        rows, next_cursor = pagination.split_page(cur.fetchall(), page_args, lambda row: (row[7], row[0]))
         posts = []
-        for row in cur.fetchall():
-            post_id, title, content, created_time, thumbnail_url = row
+        for row in rows:
+            post_id, title, excerpt, reading_time, first_image_url, created_time, thumbnail_url, _, snippet = row
             posts.append({
                 "id": post_id,
                 "title": title,
-                "content": content,
+                "excerpt": excerpt,
+                "reading_time": reading_time,
+                "first_image_url": first_image_url,
                 "created_time": created_time.timestamp() if created_time else None,
-                "thumbnail_url": thumbnail_url
+                "thumbnail_url": thumbnail_url,
+                "snippet": snippet
             })
         
         total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
@@ -1490,7 +1532,8 @@ def get_blog_posts():
                 "total_count": total_count,
                 "total_pages": total_pages,
                 "current_page": page,
-                "per_page": per_page
+                "per_page": per_page,
+                "next_cursor": next_cursor
             }
         })
         
@@ -1606,6 +1649,16 @@ def faucet():
         raiser_id=raiser_id
     )
 
+@app.route("/api/pool-stats")
+def get_pool_stats():
+   # Behind a same-host reverse proxy every request comes from 127.0.0.1, so
+   # the endpoint is off unless POOL_STATS_TOKEN is set and must be called
+   # with it in the X-Pool-Stats-Token header.
+   token = os.getenv("POOL_STATS_TOKEN")
+   if not token or not secrets.compare_digest(request.headers.get("X-Pool-Stats-Token", ""), token):
+      return redirect(url_for('not_found'))
+   return jsonify({"success": True, "pool": db.pool_stats()})
+
 @app.route('/relay', methods=['POST'])
 def relay_transaction():
     try:
@@ -1655,10 +1708,13 @@ def relay_transaction():
         account = w3.eth.account.from_key(relayer_private_key)
         relayer_address = account.address
         
-        gas_price = w3.eth.gas_price
+        gas_price, relayer_balance, relayer_nonce = (rpc.to_int(value) for value in rpc.batch([
+            ("eth_gasPrice", []),
+            ("eth_getBalance", [relayer_address, "latest"]),
+            ("eth_getTransactionCount", [relayer_address, "latest"])
+        ]))
         estimated_gas = 200000
         required_balance = gas_price * estimated_gas
-        relayer_balance = w3.eth.get_balance(relayer_address)
         
         if relayer_balance < required_balance:
             return jsonify({"error": "Relayer has insufficient balance"}), 500
@@ -1670,7 +1726,7 @@ def relay_transaction():
                 signature
             ).build_transaction({
                 'from': relayer_address,
-                'nonce': w3.eth.get_transaction_count(relayer_address),
+                'nonce': relayer_nonce,
                 'gas': estimated_gas,
                 'gasPrice': gas_price
             })
@@ -1681,7 +1737,7 @@ def relay_transaction():
                 signature
             ).build_transaction({
                 'from': relayer_address,
-                'nonce': w3.eth.get_transaction_count(relayer_address),
+                'nonce': relayer_nonce,
                 'gas': estimated_gas,
                 'gasPrice': gas_price
             })
@@ -1707,4 +1763,5 @@ def relay_transaction():
         return jsonify({"error": str(e)}), 500
     
 if __name__ == "__main__":
+   db.warm_pool()
    app.run(host="0.0.0.0", port=5555)
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""Check that /api/blog/posts cursor paging returns every post exactly once.
+
+Creates a throwaway database (CHECK_DB_NAME, dropped afterwards unless
+--keep-db) with create_tables.sql and the migrations, inserts posts whose
+full-text ranks and created_time values are tied in groups, then walks
+next_cursor through app.py's endpoint in full-text, title and plain listing
+mode at several page sizes. Each walk must return the same posts in the same
+order as one unpaged request, with no repeats and nothing skipped. A cursor
+from one mode sent to another must get a 400, not a database error.
+
+Usage: python benchmarks/blog_paging_check.py [--keep-db]
+Exit status is 1 on any mismatch.
+"""
+import base64
+import datetime
+import json
+import os
+import subprocess
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(BASE_DIR, '..')
+load_dotenv(dotenv_path=os.path.join(ROOT_DIR, 'config.env'))
+sys.path.insert(0, ROOT_DIR)
+import db
+
+CHECK_DB_NAME = "openfund_blog_paging"
+PAGE_SIZES = (1, 2, 3, 7)
+
+# (title, content, hours before 2025-01-01, status); tied groups share everything
+# but the id, so only the id orders them
+POSTS = (
+    [("Solar farms", "A solar project funded by its community.", 10, 'posted')] * 12
+    + [("Solar " * n, "solar " * n + "power", 20 + n, 'posted') for n in range(1, 6)]
+    + [("Wind farms", "Turbines and storage.", 10, 'posted')] * 4
+    + [("Solar draft", "solar solar solar", 5, 'draft')] * 2
+)
+# (query, mode, expected total)
+SEARCHES = (
+    ("solar", "full-text", 17),
+    ("ol", "title", 17),
+    ("", "listing", 21),
+)
+
+
+def admin_execute(sql):
+    conn = db.connect()
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    cur = conn.cursor()
+    cur.execute(sql)
+    cur.close()
+    conn.close()
+
+
+def create_database():
+    admin_execute(f"DROP DATABASE IF EXISTS {CHECK_DB_NAME}")
+    admin_execute(f"CREATE DATABASE {CHECK_DB_NAME}")
+    os.environ["DB_NAME"] = CHECK_DB_NAME
+
+    conn = db.connect()
+    try:
+        cur = conn.cursor()
+        with open(os.path.join(ROOT_DIR, 'postgre', 'create_tables.sql')) as f:
+            cur.execute(f.read())
+        conn.commit()
+        subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'postgre', 'migrate.py')],
+                       check=True, stdout=subprocess.DEVNULL)
+        now = datetime.datetime(2025, 1, 1)
+        for title, content, hours, status in POSTS:
+            cur.execute("""
+                INSERT INTO post (title, content, created_time, thumbnail_url, status)
+                VALUES (%s, %s, %s, '', %s)
+            """, (title, content, now - datetime.timedelta(hours=hours), status))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def walk(client, query, per_page):
+    """Post ids of every page reached through next_cursor, None if it never runs out"""
+    ids = []
+    cursor = None
+    for _ in range(len(POSTS) + 2):
+        params = {"query": query, "per_page": per_page}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/blog/posts", query_string=params).get_json()
+        ids.extend(post["id"] for post in body["posts"])
+        cursor = body["pagination"]["next_cursor"]
+        if cursor is None:
+            return ids
+    return None
+
+
+def encode(sort_key, row_id):
+    raw = json.dumps([sort_key, row_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def check(client):
+    ok = True
+    for query, mode, total in SEARCHES:
+        body = client.get("/api/blog/posts", query_string={"query": query, "per_page": 50}).get_json()
+        expected = [post["id"] for post in body["posts"]]
+        if len(expected) != total or body["pagination"]["total_count"] != total:
+            print(f"FAIL {mode}: expected {total} posts, got {len(expected)} "
+                  f"(total_count {body['pagination']['total_count']})")
+            ok = False
+            continue
+        for per_page in PAGE_SIZES:
+            ids = walk(client, query, per_page)
+            if ids is None:
+                print(f"FAIL {mode} per_page={per_page}: next_cursor still set after {len(POSTS) + 2} pages")
+                ok = False
+            elif ids == expected:
+                print(f"ok   {mode} per_page={per_page}: {len(ids)} posts")
+            else:
+                print(f"FAIL {mode} per_page={per_page}: {len(ids)} posts, {len(set(ids))} distinct, "
+                      f"{len(set(expected) - set(ids))} skipped, order matches: {ids == expected}")
+                ok = False
+
+    some_id = expected[0]
+    mismatched = (
+        ("full-text with a created_time cursor", "solar", encode("2025-01-01T00:00:00", some_id)),
+        ("title with a rank cursor", "ol", encode(0.5, some_id)),
+        ("listing with a non-UUID id", "", encode("2025-01-01T00:00:00", 5)),
+    )
+    for label, query, cursor in mismatched:
+        status = client.get("/api/blog/posts", query_string={"query": query, "cursor": cursor}).status_code
+        if status == 400:
+            print(f"ok   {label}: 400")
+        else:
+            print(f"FAIL {label}: {status}")
+            ok = False
+    return ok
+
+
+def main():
+    admin_db_name = os.getenv("DB_NAME")
+    try:
+        create_database()
+        import app
+        ok = check(app.app.test_client())
+    finally:
+        if '--keep-db' not in sys.argv:
+            os.environ["DB_NAME"] = admin_db_name
+            db.get_pool().closeall()
+            admin_execute(f"DROP DATABASE IF EXISTS {CHECK_DB_NAME} WITH (FORCE)")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Logs per second of log_decoder against web3's contract.events.X().process_log.
+
+First checks on the same synthetic OpenFund logs (every event of
+OpenFund.sol, random and boundary values) that both decoders give the same
+event name, arguments, block number, log index and transaction hash, and that
+the scanner builds identical transaction rows from either; exits 1 on any
+difference. Then times both over --logs logs.
+
+The reference ABI below is written out from contracts/OpenFund.sol
+independently of log_decoder.OPENFUND_EVENTS.
+
+Usage: python benchmarks/log_decoder_benchmark.py [--logs N] [--seed N]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+from hexbytes import HexBytes
+from web3 import Web3
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(dotenv_path=os.path.join(BASE_DIR, '..', 'config.env'))
+sys.path.insert(0, os.path.join(BASE_DIR, '..'))
+import log_decoder
+import scanner_transaction_cronjob as scanner
+
+
+def abi_event(name, *inputs):
+    return {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": indexed, "internalType": kind, "name": argument, "type": kind}
+            for argument, kind, indexed in inputs
+        ],
+        "name": name,
+        "type": "event"
+    }
+
+
+REFERENCE_ABI = [
+    abi_event("ProjectCreated", ("projectId", "uint256", True), ("raiser", "address", True),
+              ("tokensToSell", "uint256", False), ("tokenPrice", "uint256", False),
+              ("endFundingTime", "uint256", False)),
+    abi_event("TokensDeposited", ("projectId", "uint256", True), ("amount", "uint256", False)),
+    abi_event("InvestmentMade", ("projectId", "uint256", True), ("investor", "address", True),
+              ("amount", "uint256", False), ("tokensToReceive", "uint256", False)),
+    abi_event("VoteCast", ("projectId", "uint256", True), ("voter", "address", True)),
+    abi_event("FundsClaimed", ("projectId", "uint256", True), ("amount", "uint256", False)),
+    abi_event("Refunded", ("projectId", "uint256", True), ("investor", "address", True),
+              ("amount", "uint256", False)),
+    abi_event("UnsoldTokensClaimed", ("projectId", "uint256", True), ("amount", "uint256", False)),
+    abi_event("PlatformFeeClaimed", ("projectId", "uint256", True), ("amount", "uint256", False)),
+    abi_event("ProjectFailed", ("projectId", "uint256", False))
+]
+
+
+def event_topic(event):
+    return HexBytes(Web3.keccak(text=f"{event['name']}({','.join(x['type'] for x in event['inputs'])})"))
+
+
+REFERENCE_NAMES = {Web3.to_hex(event_topic(event)): event['name'] for event in REFERENCE_ABI}
+BOUNDARY_UINTS = (0, 1, 10**6, 2**64, 2**256 - 1)
+
+
+def random_value(rng, kind):
+    if kind == "address":
+        return rng.getrandbits(160)
+    if rng.random() < 0.1:
+        return rng.choice(BOUNDARY_UINTS)
+    return rng.getrandbits(rng.choice((32, 64, 96, 256)))
+
+
+def synthetic_logs(count, rng):
+    """eth_getLogs-shaped logs cycling through every OpenFund event"""
+    logs = []
+    for i in range(count):
+        event = REFERENCE_ABI[i % len(REFERENCE_ABI)]
+        topics = [event_topic(event)]
+        data = b""
+        for argument in event["inputs"]:
+            word = random_value(rng, argument["type"]).to_bytes(32, "big")
+            if argument["indexed"]:
+                topics.append(HexBytes(word))
+            else:
+                data += word
+        logs.append({
+            "address": scanner.CONTRACT_ADDRESS,
+            "topics": topics,
+            "data": HexBytes(data),
+            "blockNumber": 1000 + i // 10,
+            "blockHash": HexBytes(rng.getrandbits(256).to_bytes(32, "big")),
+            "transactionHash": HexBytes(rng.getrandbits(256).to_bytes(32, "big")),
+            "transactionIndex": i % 10,
+            "logIndex": i % 10,
+            "removed": False
+        })
+    return logs
+
+
+def decode_with_web3(contract, log):
+    name = REFERENCE_NAMES.get(Web3.to_hex(log['topics'][0]))
+    return getattr(contract.events, name)().process_log(log)
+
+
+def normalize(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def check(contract, logs):
+    """Differences between the two decoders on logs (empty if none)"""
+    transaction_time = datetime.datetime(2025, 1, 1)
+    differences = []
+    for log in logs:
+        expected = decode_with_web3(contract, log)
+        decoded = log_decoder.decode_log(log)
+        if decoded is None:
+            differences.append(f"{expected['event']}: not decoded")
+            continue
+        fields = (
+            (expected['event'], decoded.event),
+            (expected['blockNumber'], decoded.blockNumber),
+            (expected['logIndex'], decoded.logIndex),
+            (expected['transactionHash'], decoded.transactionHash),
+            ({k: normalize(v) for k, v in expected['args'].items()}, decoded.args)
+        )
+        for want, got in fields:
+            if want != got:
+                differences.append(f"{expected['event']}: expected {want!r}, got {got!r}")
+        if decoded.event in scanner.EVENT_ROWS:
+            build_row = scanner.EVENT_ROWS[decoded.event]
+            want, got = build_row(expected, transaction_time), build_row(decoded, transaction_time)
+            if want != got:
+                differences.append(f"{decoded.event} row: expected {want!r}, got {got!r}")
+    return differences
+
+
+def run(name, decode, logs):
+    started = time.perf_counter()
+    for log in logs:
+        decode(log)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<12} {len(logs):>7} logs  {elapsed:8.3f}s  {len(logs) / elapsed:12.1f} logs/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=20000, help="synthetic logs to decode")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the synthetic logs")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    contract = Web3().eth.contract(abi=REFERENCE_ABI)
+
+    differences = check(contract, synthetic_logs(max(len(REFERENCE_ABI) * 50, 500), rng))
+    if differences:
+        for difference in differences[:20]:
+            print(difference)
+        print(f"FAIL: {len(differences)} differences between log_decoder and process_log")
+        sys.exit(1)
+    print("log_decoder output matches process_log")
+
+    logs = synthetic_logs(args.logs, rng)
+    before = run("process_log", lambda log: decode_with_web3(contract, log), logs)
+    after = run("log_decoder", log_decoder.decode_log, logs)
+    print(f"speed-up     {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Check that the scanner's --subscribe mode ingests exactly what polling does.
+
+Against a hardhat node in contracts/test, runs scripts/scanner_bench_workload.js
+in phases while `scanner_transaction_cronjob.py --subscribe` is running,
+connected to the node's WebSocket endpoint through a local proxy:
+
+  1. invest round, logs pushed over the subscription
+  2. the proxy cuts the socket, invest round while the scanner polls and
+     then resubscribes
+  3. the scanner process is stopped, invest round, scanner restarted (its
+     gap-fill scan has to catch up)
+  4. votes and refunds, pushed again
+
+Then a plain polling scan ingests the same chain into a second database and
+both `transaction` and `investor_position` must match row for row, with
+one transaction row per emitted event. Exits 1 otherwise.
+
+Requires `npm install` in contracts/test and a Postgres role allowed to
+create databases. Takes a minute or two (the scanner polls for 30 seconds
+after losing its socket).
+
+Usage: python benchmarks/scanner_subscribe_check.py [--wallets N] [--projects N] [--keep-db]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import psycopg2
+import scanner_throughput_benchmark as bench
+
+SCANNER = os.path.join(bench.ROOT_DIR, 'scanner_transaction_cronjob.py')
+SUBSCRIBE_DB_NAME = "openfund_scanner_subscribe"
+POLL_DB_NAME = "openfund_scanner_poll"
+NODE_PORT = 8545
+WAIT_SECONDS = 120
+# Pushed logs must be written well before the scanner's next gap-fill scan
+# (GAP_FILL_INTERVAL after subscribing) could pick them up instead
+PUSH_WAIT_SECONDS = 20
+
+TRANSACTION_ROWS_SQL = """
+    SELECT project_id, investor_address, amount, token_received, transaction_time,
+           transaction_hash, type, log_index
+    FROM transaction
+    ORDER BY transaction_hash, log_index
+"""
+POSITION_ROWS_SQL = """
+    SELECT investor_address, project_id, amount_invested, tokens_received, amount_refunded,
+           voted, refunded, last_activity_time
+    FROM investor_position
+    ORDER BY investor_address, project_id
+"""
+
+
+class DropProxy:
+    """TCP forwarder to the node whose open connections can be cut with drop()"""
+
+    def __init__(self, target_port):
+        self.target_port = target_port
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.connections = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(("127.0.0.1", self.target_port))
+            with self.lock:
+                self.connections.extend((client, upstream))
+            threading.Thread(target=self._pump, args=(client, upstream), daemon=True).start()
+            threading.Thread(target=self._pump, args=(upstream, client), daemon=True).start()
+
+    @staticmethod
+    def _pump(source, target):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                target.sendall(data)
+        except OSError:
+            pass
+        for sock in (source, target):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def drop(self):
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for sock in connections:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def close(self):
+        self.listener.close()
+        self.drop()
+
+
+def connect(name):
+    return psycopg2.connect(dbname=name, user=os.getenv("DB_USER"), password=os.getenv("DB_PASSWORD"),
+                            host=os.getenv("DB_HOST"), port=os.getenv("DB_PORT"))
+
+
+def fetch_rows(name, sql):
+    conn = connect(name)
+    try:
+        cur = conn.cursor()
+        cur.execute(sql)
+        return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def transaction_count(name):
+    return fetch_rows(name, "SELECT COUNT(*) FROM transaction")[0][0]
+
+
+def scanner_env(name, openfund_address):
+    return dict(os.environ, DB_NAME=name, RPC_URL=bench.NODE_URL, OPENFUND_CONTRACT_ADDRESS=openfund_address)
+
+
+class Subscriber:
+    """scanner_transaction_cronjob.py --subscribe in a child process, output kept in a log file"""
+
+    def __init__(self, ws_url, env, log_path):
+        self.ws_url = ws_url
+        self.env = env
+        self.log_path = log_path
+        self.process = None
+
+    def start(self):
+        with open(self.log_path, 'a') as log_file:
+            self.process = subprocess.Popen([sys.executable, "-u", SCANNER, "--subscribe", self.ws_url],
+                                            cwd=bench.ROOT_DIR, env=self.env,
+                                            stdout=log_file, stderr=subprocess.STDOUT)
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+
+    def subscriptions(self):
+        with open(self.log_path) as f:
+            return f.read().count("Subscribed to OpenFund logs")
+
+    def wait_for_subscriptions(self, count):
+        deadline = time.monotonic() + WAIT_SECONDS
+        while self.subscriptions() < count:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"subscriber exited, see {self.log_path}")
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"no subscription #{count} after {WAIT_SECONDS}s, see {self.log_path}")
+            time.sleep(0.5)
+
+
+def wait_for_rows(name, expected, timeout=WAIT_SECONDS):
+    """Transaction rows in the database once it has expected of them (or at the timeout)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        count = transaction_count(name)
+        if count >= expected:
+            return count
+        if time.monotonic() > deadline:
+            return count
+        time.sleep(0.5)
+
+
+def compare(label, expected, actual):
+    """Differences between two row lists, printed; True if identical"""
+    if expected == actual:
+        bench.log(f"ok   {label}: {len(actual)} rows identical")
+        return True
+    missing = [row for row in expected if row not in actual]
+    extra = [row for row in actual if row not in expected]
+    bench.log(f"FAIL {label}: polling {len(expected)} rows, subscription {len(actual)} rows "
+              f"({len(missing)} missing, {len(extra)} extra or different)")
+    for row in (missing + extra)[:10]:
+        bench.log(f"     {row}")
+    return False
+
+
+def run_check(args, tmp):
+    state = os.path.join(tmp, "state.json")
+    events_hint = args.projects * args.wallets * (args.rounds + 2)
+    bench.log(f"Deploying ({args.projects} projects, {args.wallets} wallets)...")
+    setup = bench.run_workload(events_hint, args.wallets, args.rounds, phase="setup", state=state)
+
+    admin_db_name = os.getenv("DB_NAME")
+    for name in (SUBSCRIBE_DB_NAME, POLL_DB_NAME):
+        bench.create_database(setup, name)
+        os.environ["DB_NAME"] = admin_db_name
+
+    proxy = DropProxy(NODE_PORT)
+    subscriber = Subscriber(f"ws://127.0.0.1:{proxy.port}", scanner_env(SUBSCRIBE_DB_NAME, setup["openfund_address"]),
+                            os.path.join(tmp, "subscriber.log"))
+    expected = 0
+    ok = True
+    try:
+        subscriber.start()
+        subscriber.wait_for_subscriptions(1)
+
+        def phase(name, label):
+            nonlocal expected
+            summary = bench.run_workload(events_hint, args.wallets, args.rounds, phase=name, state=state)
+            expected += summary["total_events"]
+            bench.log(f"{label}: {summary['total_events']} events in blocks "
+                      f"{summary['start_block']}-{summary['end_block']}")
+
+        def wait_for_pushed():
+            nonlocal ok
+            ingested = wait_for_rows(SUBSCRIBE_DB_NAME, expected, PUSH_WAIT_SECONDS)
+            if ingested < expected:
+                bench.log(f"FAIL only {ingested} of {expected} events written within "
+                          f"{PUSH_WAIT_SECONDS}s of being pushed")
+                ok = False
+
+        phase("invest", "Pushed over the subscription")
+        wait_for_pushed()
+
+        proxy.drop()
+        phase("invest", "While the socket is down")
+        subscriber.wait_for_subscriptions(2)
+        wait_for_rows(SUBSCRIBE_DB_NAME, expected)
+
+        subscriber.stop()
+        phase("invest", "While the scanner is stopped")
+        subscriber.start()
+        subscriber.wait_for_subscriptions(3)
+        wait_for_rows(SUBSCRIBE_DB_NAME, expected)
+
+        phase("settle", "Votes and refunds, pushed")
+        wait_for_pushed()
+        ingested = wait_for_rows(SUBSCRIBE_DB_NAME, expected)
+    finally:
+        subscriber.stop()
+        proxy.close()
+
+    bench.log("Polling scan into a second database...")
+    subprocess.run([sys.executable, "-c",
+                    "import sys, scanner_transaction_cronjob as s; sys.exit(0 if s.scan_for_events() is not None else 1)"],
+                   cwd=bench.ROOT_DIR, env=scanner_env(POLL_DB_NAME, setup["openfund_address"]),
+                   check=True, stdout=subprocess.DEVNULL)
+
+    if ingested != expected:
+        ok = False
+        bench.log(f"FAIL subscription ingested {ingested} of {expected} events")
+    polled = fetch_rows(POLL_DB_NAME, TRANSACTION_ROWS_SQL)
+    if len(polled) != expected:
+        bench.log(f"FAIL polling ingested {len(polled)} of {expected} events")
+        ok = False
+    ok &= compare("transaction", polled, fetch_rows(SUBSCRIBE_DB_NAME, TRANSACTION_ROWS_SQL))
+    ok &= compare("investor_position", fetch_rows(POLL_DB_NAME, POSITION_ROWS_SQL),
+                  fetch_rows(SUBSCRIBE_DB_NAME, POSITION_ROWS_SQL))
+    if not ok:
+        bench.log(f"Subscriber output: {subscriber.log_path}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wallets", type=int, default=20, help="investor wallets")
+    parser.add_argument("--projects", type=int, default=2, help="projects to invest in")
+    parser.add_argument("--keep-db", action="store_true",
+                        help=f"keep the {SUBSCRIBE_DB_NAME} and {POLL_DB_NAME} databases")
+    args = parser.parse_args()
+    # Three invest phases, each one investment per wallet and project
+    args.rounds = 3
+
+    admin_db_name = os.getenv("DB_NAME")
+    bench.log("Starting hardhat node...")
+    node = bench.start_node()
+    tmp = tempfile.mkdtemp(prefix="scanner_subscribe_")
+    try:
+        ok = run_check(args, tmp)
+    finally:
+        node.terminate()
+        node.wait()
+        if not args.keep_db:
+            os.environ["DB_NAME"] = admin_db_name
+            for name in (SUBSCRIBE_DB_NAME, POLL_DB_NAME):
+                bench.admin_execute(f"DROP DATABASE IF EXISTS {name}")
+    if not ok:
+        sys.exit(1)
+    print("subscribe mode matches polling")
+
+
+if __name__ == "__main__":
+    main()
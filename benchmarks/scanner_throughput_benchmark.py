@@ -0,0 +1,232 @@
+"""End-to-end ingest throughput of scanner_transaction_cronjob.py.
+
+Starts a hardhat node in contracts/test, runs scripts/scanner_bench_workload.js
+there (deploys OpenFund / TestUSDT / TestProjectToken and emits invest, vote
+and refund events from many wallets), then lets the scanner catch up from
+the deployment block into a throwaway database created next to the one in
+config.env (create_tables.sql + migrations).
+
+Reports events/sec, JSON-RPC calls per event and DB statements per event as
+one JSON object on stdout (and in --output), for CI trend tracking.
+
+Requires `npm install` in contracts/test and a Postgres role allowed to
+create databases.
+
+No results are recorded in the repository yet, so there is no baseline to
+compare against: the batched, single-getLogs scanner has not been measured
+end to end against the per-event one. To compare two revisions, run this
+script on each with the same --events/--wallets and diff the JSON objects.
+
+Usage: python benchmarks/scanner_throughput_benchmark.py [--events N] [--wallets N] [--output FILE]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import psycopg2
+import requests
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(BASE_DIR, '..')
+HARDHAT_DIR = os.path.join(ROOT_DIR, 'contracts', 'test')
+load_dotenv(dotenv_path=os.path.join(ROOT_DIR, 'config.env'))
+sys.path.insert(0, ROOT_DIR)
+import db
+
+NODE_URL = "http://127.0.0.1:8545"
+BENCH_DB_NAME = "openfund_scanner_bench"
+
+
+def log(message):
+    print(message, file=sys.stderr)
+
+
+def start_node():
+    node = subprocess.Popen(["npx", "hardhat", "node"], cwd=HARDHAT_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            requests.post(NODE_URL, json={"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}, timeout=2)
+            return node
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.5)
+    node.terminate()
+    raise RuntimeError("hardhat node did not start within 60 seconds")
+
+
+def run_workload(events, wallets, rounds, phase="all", state=None):
+    """Run scripts/scanner_bench_workload.js (one BENCH_PHASE of it) and return its summary"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "workload.json")
+        env = dict(os.environ, BENCH_EVENTS=str(events), BENCH_WALLETS=str(wallets),
+                   BENCH_ROUNDS=str(rounds), BENCH_OUTPUT=output, BENCH_PHASE=phase)
+        if state:
+            env["BENCH_STATE"] = state
+        subprocess.run(["npx", "hardhat", "run", "--network", "localhost", "scripts/scanner_bench_workload.js"],
+                       cwd=HARDHAT_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(output) as f:
+            return json.load(f)
+
+
+def admin_execute(sql):
+    conn = db.connect()
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    cur = conn.cursor()
+    cur.execute(sql)
+    cur.close()
+    conn.close()
+
+
+def create_database(workload, name=BENCH_DB_NAME):
+    admin_execute(f"DROP DATABASE IF EXISTS {name}")
+    admin_execute(f"CREATE DATABASE {name}")
+    os.environ["DB_NAME"] = name
+
+    conn = db.connect()
+    cur = conn.cursor()
+    with open(os.path.join(ROOT_DIR, 'postgre', 'create_tables.sql')) as f:
+        cur.execute(f.read())
+    conn.commit()
+    subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'postgre', 'migrate.py')],
+                   check=True, stdout=subprocess.DEVNULL)
+
+    # transaction.project_id references project, so the on-chain ids must exist
+    cur.execute("""
+        INSERT INTO raiser (username, first_name, email, hashed_password, salt, wallet_address)
+        VALUES ('bench', 'Bench', 'bench@example.com', 'x', 'x', '0xbench')
+        RETURNING id
+    """)
+    raiser_id = cur.fetchone()[0]
+    cur.execute("""
+        INSERT INTO project (id, raiser_id, name, token_name, token_symbol, investment_end_time,
+                             listing_status, funding_status, total_token_supply, token_to_sell,
+                             token_price, token_address, funding_address, fund_raised, token_sold,
+                             decimal, vote_for_refund, description, platform_comment)
+        SELECT g, %s, 'Bench ' || g, 'Token', 'TKN', 0, 'accepted', 'raising', 1000000, 100000,
+               0.5, '0xtoken', '0xfunding', 0, 0, 18, 0, 'Benchmark project', ''
+        FROM generate_series(1, %s) g
+    """, (raiser_id, workload["projects"]))
+    cur.execute("INSERT INTO scanner_checkpoint (name, last_block) VALUES ('transaction_scanner', %s)",
+                (workload["start_block"] - 1,))
+    conn.commit()
+    conn.close()
+
+
+def instrument(scanner, stats):
+    """Count JSON-RPC calls, HTTP requests and SQL statements made by the scanner"""
+    # web3 requests and rpc.batch() share the client's session: count every
+    # POST there, and the calls inside the JSON-RPC batches sent with json=
+    provider_class = scanner.Web3.HTTPProvider
+    make_request = provider_class.make_request
+
+    def counted_make_request(self, method, params):
+        stats["rpc_calls"] += 1
+        return make_request(self, method, params)
+    provider_class.make_request = counted_make_request
+
+    session = scanner.rpc.get_client().session
+    session_post = session.post
+
+    def counted_post(url, *args, **kwargs):
+        stats["http_requests"] += 1
+        payload = kwargs.get("json")
+        if payload is not None:
+            stats["rpc_calls"] += len(payload) if isinstance(payload, list) else 1
+        return session_post(url, *args, **kwargs)
+    session.post = counted_post
+
+    class CountingCursor(psycopg2.extensions.cursor):
+        def execute(self, query, vars=None):
+            stats["db_statements"] += 1
+            return super().execute(query, vars)
+
+        def executemany(self, query, vars_list):
+            stats["db_statements"] += len(vars_list)
+            return super().executemany(query, vars_list)
+
+    def get_db_connection():
+        return psycopg2.connect(dbname=BENCH_DB_NAME, user=scanner.DB_USER, password=scanner.DB_PASSWORD,
+                                host=scanner.DB_HOST, port=scanner.DB_PORT, cursor_factory=CountingCursor)
+    scanner.get_db_connection = get_db_connection
+
+
+def run_scanner(workload):
+    os.environ["RPC_URL"] = NODE_URL
+    os.environ["OPENFUND_CONTRACT_ADDRESS"] = workload["openfund_address"]
+    import scanner_transaction_cronjob as scanner
+
+    stats = {"rpc_calls": 0, "http_requests": 0, "db_statements": 0}
+    instrument(scanner, stats)
+
+    started = time.perf_counter()
+    if scanner.scan_for_events() is None:
+        raise RuntimeError("scanner failed, see output above")
+    elapsed = time.perf_counter() - started
+
+    conn = db.connect()
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM transaction")
+    ingested = cur.fetchone()[0]
+    conn.close()
+    return stats, elapsed, ingested, scanner.chunk_sizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000, help="approximate OpenFund events to emit")
+    parser.add_argument("--wallets", type=int, default=100, help="investor wallets")
+    parser.add_argument("--rounds", type=int, default=3, help="investments per wallet and project (max 10)")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    parser.add_argument("--keep-db", action="store_true", help=f"keep the {BENCH_DB_NAME} database")
+    args = parser.parse_args()
+
+    admin_db_name = os.getenv("DB_NAME")
+    log("Starting hardhat node...")
+    node = start_node()
+    try:
+        log(f"Running workload ({args.events} events, {args.wallets} wallets)...")
+        workload = run_workload(args.events, args.wallets, args.rounds)
+        log(f"Emitted {workload['total_events']} events in blocks {workload['start_block']}-{workload['end_block']}")
+        create_database(workload)
+        stats, elapsed, ingested, chunk_sizer = run_scanner(workload)
+    finally:
+        node.terminate()
+        node.wait()
+        if not args.keep_db:
+            os.environ["DB_NAME"] = admin_db_name
+            admin_execute(f"DROP DATABASE IF EXISTS {BENCH_DB_NAME}")
+
+    events = workload["total_events"]
+    result = {
+        "benchmark": "scanner_throughput",
+        "timestamp": int(time.time()),
+        "events": events,
+        "events_ingested": ingested,
+        "blocks": workload["end_block"] - workload["start_block"] + 1,
+        "seconds": round(elapsed, 3),
+        "events_per_sec": round(events / elapsed, 1),
+        "rpc_calls": stats["rpc_calls"],
+        "rpc_calls_per_event": round(stats["rpc_calls"] / events, 4),
+        "http_requests": stats["http_requests"],
+        "db_statements": stats["db_statements"],
+        "db_statements_per_event": round(stats["db_statements"] / events, 4),
+        "final_chunk_size": chunk_sizer.size,
+        "chunk_size_grown": chunk_sizer.grown,
+        "chunk_size_shrunk": chunk_sizer.shrunk
+    }
+    print(json.dumps(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    if ingested != events:
+        log(f"FAIL: ingested {ingested} of {events} events")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
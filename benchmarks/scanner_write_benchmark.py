@@ -0,0 +1,127 @@
+"""Rows per second of the scanner's database writes, before and after batching.
+
+"per-event" replays the old handler behaviour: one connection, an investor
+SELECT-then-INSERT, a transaction INSERT and a position upsert per event,
+committed twice. "batched" is scanner_transaction_cronjob.write_chunk(): one
+transaction per block range with execute_values.
+
+Both run against copies of the tables the scanner writes in a
+scratch schema (dropped afterwards) of the database configured in config.env.
+
+Usage: python benchmarks/scanner_write_benchmark.py [--events N] [--chunk N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(dotenv_path=os.path.join(BASE_DIR, '..', 'config.env'))
+sys.path.insert(0, os.path.join(BASE_DIR, '..'))
+import db
+import scanner_transaction_cronjob as scanner
+
+SCHEMA = "scanner_bench"
+TABLES = ("investor", "transaction", "investor_position", "scanner_checkpoint")
+
+
+def synthetic_rows(count, investors=500, projects=50):
+    start = datetime.datetime(2025, 1, 1)
+    rows = []
+    for i in range(count):
+        investor_address = '0x' + format(i % investors, '040x')
+        project_id = 1 + i % projects
+        transaction_time = start + datetime.timedelta(seconds=i)
+        transaction_hash = '0x' + format(i, '064x')
+        kind = i % 10
+        if kind < 8:
+            rows.append((project_id, investor_address, 10.0, 100, transaction_time, transaction_hash, 'investment', 0))
+        elif kind == 8:
+            rows.append((project_id, investor_address, None, None, transaction_time, transaction_hash, 'vote', 0))
+        else:
+            rows.append((project_id, investor_address, 10.0, None, transaction_time, transaction_hash, 'get_refund', 0))
+    return rows
+
+
+def bench_connect():
+    conn = db.connect()
+    cur = conn.cursor()
+    cur.execute(f"SET search_path TO {SCHEMA}, public")
+    cur.close()
+    return conn
+
+
+def reset_schema():
+    conn = db.connect()
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    for table in TABLES:
+        cur.execute(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING ALL)")
+    conn.commit()
+    conn.close()
+
+
+def drop_schema():
+    conn = db.connect()
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def write_per_event(rows, chunk):
+    for row in rows:
+        investor_address = row[1]
+        conn = bench_connect()
+        cur = conn.cursor()
+        cur.execute("SELECT id FROM investor WHERE wallet_address = %s", (investor_address,))
+        if not cur.fetchone():
+            cur.execute("INSERT INTO investor(wallet_address) VALUES (%s)", (investor_address,))
+            conn.commit()
+        cur.execute("""
+            INSERT INTO transaction(project_id, investor_address, amount, token_received, transaction_time, transaction_hash, type)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, row[:7])
+        cur.execute(scanner.POSITION_UPSERT_SQL.replace("%s", "(%s, %s, %s, %s, %s, %s, %s, %s)"),
+                    scanner.build_positions([row])[0])
+        conn.commit()
+        cur.close()
+        conn.close()
+
+
+def write_batched(rows, chunk):
+    conn = bench_connect()
+    for i in range(0, len(rows), chunk):
+        scanner.write_chunk(conn, rows[i:i + chunk], i + 1, i + chunk)
+    conn.close()
+
+
+def run(name, writer, rows, chunk):
+    reset_schema()
+    started = time.perf_counter()
+    writer(rows, chunk)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<10} {len(rows):>7} rows  {elapsed:8.2f}s  {len(rows) / elapsed:10.1f} rows/sec")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000, help="synthetic events to write")
+    parser.add_argument("--chunk", type=int, default=500, help="events per scanned block range")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.events)
+    try:
+        before = run("per-event", write_per_event, rows, args.chunk)
+        after = run("batched", write_batched, rows, args.chunk)
+    finally:
+        drop_schema()
+    print(f"speed-up   {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
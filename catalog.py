@@ -0,0 +1,163 @@
+import bisect
+import datetime
+import heapq
+import itertools
+import threading
+import change_listener
+import db
+import pagination
+
+LISTABLE_SQL = "p.listing_status = 'accepted' AND p.hidden = FALSE"
+
+SELECT_SQL = """
+    SELECT p.id, p.name, p.funding_status, p.fund_raised, p.investment_end_time,
+           CONCAT(r.first_name, ' ', r.last_name) AS raiser_name,
+           p.logo_url, p.created_time, p.listing_status, p.hidden
+    FROM project p
+    JOIN raiser r ON p.raiser_id = r.id
+"""
+
+
+class ProjectRecord:
+    __slots__ = ("id", "name", "funding_status", "fund_raised", "investment_end_time",
+                 "raiser_name", "logo_url", "created_time")
+
+    def __init__(self, id, name, funding_status, fund_raised, investment_end_time,
+                 raiser_name, logo_url, created_time):
+        self.id = id
+        self.name = name
+        self.funding_status = funding_status
+        self.fund_raised = fund_raised
+        self.investment_end_time = investment_end_time
+        self.raiser_name = raiser_name
+        self.logo_url = logo_url
+        self.created_time = created_time or datetime.datetime.min
+
+    def sort_key(self):
+        return (self.created_time, self.id)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "funding_status": self.funding_status,
+            "fund_raised": self.fund_raised,
+            "investment_end_time": self.investment_end_time,
+            "raiser_name": self.raiser_name,
+            "logo_url": self.logo_url
+        }
+
+
+class ProjectCatalog:
+    """Per-worker copy of the publicly listable projects.
+
+    Records are bucketed by funding_status, each bucket kept sorted by
+    (created_time, id). Change notifications only mark projects as dirty;
+    the next listing re-reads just those rows before serving the page.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._records = {}
+        self._buckets = {}
+        self._bucket_keys = {}
+        self._reload = True
+        self._dirty_ids = set()
+        self._dirty_raisers = set()
+
+    def handle_change(self, event):
+        table = event.get("table")
+        with self._lock:
+            if table == "*":
+                self._reload = True
+            elif table == "project" and event.get("id") is not None:
+                self._dirty_ids.add(event["id"])
+            elif table == "raiser" and event.get("id") is not None:
+                self._dirty_raisers.add(event["id"])
+
+    def refresh(self):
+        """Apply pending changes with a single query (all listable rows on first use)"""
+        with self._refresh_lock:
+            with self._lock:
+                reload, ids, raisers = self._reload, self._dirty_ids, self._dirty_raisers
+                if not (reload or ids or raisers):
+                    return
+                self._reload, self._dirty_ids, self._dirty_raisers = False, set(), set()
+            try:
+                cur = db.get_db_connection().cursor()
+                if reload:
+                    cur.execute(SELECT_SQL + " WHERE " + LISTABLE_SQL)
+                else:
+                    cur.execute(SELECT_SQL + " WHERE p.id = ANY(%s::int[]) OR p.raiser_id = ANY(%s::uuid[])",
+                                (list(ids), list(raisers)))
+                rows = cur.fetchall()
+                cur.close()
+            except Exception:
+                with self._lock:
+                    self._reload = self._reload or reload
+                    self._dirty_ids |= ids
+                    self._dirty_raisers |= raisers
+                raise
+            with self._lock:
+                if reload:
+                    self._records, self._buckets, self._bucket_keys = {}, {}, {}
+                for project_id in ids:
+                    self._remove(project_id)
+                for row in rows:
+                    self._remove(row[0])
+                    listing_status, hidden = row[8], row[9]
+                    if listing_status == 'accepted' and not hidden:
+                        self._insert(ProjectRecord(*row[:8]))
+
+    def _remove(self, project_id):
+        record = self._records.pop(project_id, None)
+        if record is None:
+            return
+        keys = self._bucket_keys[record.funding_status]
+        index = bisect.bisect_left(keys, record.sort_key())
+        del keys[index]
+        del self._buckets[record.funding_status][index]
+
+    def _insert(self, record):
+        self._records[record.id] = record
+        keys = self._bucket_keys.setdefault(record.funding_status, [])
+        bucket = self._buckets.setdefault(record.funding_status, [])
+        index = bisect.bisect_left(keys, record.sort_key())
+        keys.insert(index, record.sort_key())
+        bucket.insert(index, record)
+
+    def list_projects(self, statuses, page_args):
+        """(projects, total_count, next_cursor) for the newest-first listing of statuses"""
+        self.refresh()
+        with self._lock:
+            total_count = 0
+            streams = []
+            for status in statuses:
+                bucket = self._buckets.get(status, [])
+                total_count += len(bucket)
+                end = len(bucket)
+                if page_args["cursor"] is not None:
+                    end = bisect.bisect_left(self._bucket_keys[status], tuple(page_args["cursor"])) if bucket else 0
+                streams.append(reversed(bucket[:end]))
+            merged = heapq.merge(*streams, key=ProjectRecord.sort_key, reverse=True)
+            start = page_args["offset"] if page_args["cursor"] is None else 0
+            rows = list(itertools.islice(merged, start, start + page_args["per_page"] + 1))
+        rows, next_cursor = pagination.split_page(rows, page_args, ProjectRecord.sort_key)
+        return [record.to_dict() for record in rows], total_count, next_cursor
+
+    def stats(self):
+        with self._lock:
+            return {status: len(bucket) for status, bucket in self._buckets.items()}
+
+
+catalog = ProjectCatalog()
+
+
+def list_projects(statuses, page_args):
+    return catalog.list_projects(statuses, page_args)
+
+
+def init_app(app):
+    change_listener.subscribe(catalog.handle_change)
+    change_listener.init_app(app)
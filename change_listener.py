@@ -0,0 +1,79 @@
+import json
+import os
+import select
+import threading
+import time
+import psycopg2
+import db
+
+CHANNEL = "openfund_changes"
+RECONNECT_DELAY = 5
+
+# Sent to every handler after (re)connecting: notifications may have been
+# missed while the listener was down, so cached data must be dropped.
+RESYNC = {"table": "*", "op": "RESYNC"}
+
+_handlers = []
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def subscribe(handler):
+    """Register handler(event) to be called for every change notification"""
+    if handler not in _handlers:
+        _handlers.append(handler)
+
+
+def dispatch(event):
+    for handler in list(_handlers):
+        try:
+            handler(event)
+        except Exception as e:
+            print(f"Change handler error: {e}")
+
+
+def _listen_forever():
+    while True:
+        conn = None
+        try:
+            conn = db.connect()
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            cur = conn.cursor()
+            cur.execute(f"LISTEN {CHANNEL}")
+            dispatch(RESYNC)
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        event = json.loads(notify.payload)
+                    except ValueError:
+                        continue
+                    dispatch(event)
+        except Exception as e:
+            print(f"Change listener error: {e}")
+            dispatch(RESYNC)
+        finally:
+            if conn is not None and not conn.closed:
+                conn.close()
+        time.sleep(RECONNECT_DELAY)
+
+
+def ensure_started():
+    """Start this process' listener thread (again after a fork)"""
+    global _thread
+    if _thread is not None and _thread.pid == os.getpid() and _thread.is_alive():
+        return
+    with _thread_lock:
+        if _thread is not None and _thread.pid == os.getpid() and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_listen_forever, name="change-listener", daemon=True)
+        _thread.pid = os.getpid()
+        _thread.start()
+
+
+def init_app(app):
+    if ensure_started not in app.before_request_funcs.get(None, []):
+        app.before_request(ensure_started)
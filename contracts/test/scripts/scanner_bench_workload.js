@@ -0,0 +1,182 @@
+// Workload for benchmarks/scanner_throughput_benchmark.py and
+// benchmarks/scanner_subscribe_check.py.
+//
+// Deploys TestUSDT, TestProjectToken and OpenFund on the local node, then
+// drives BENCH_WALLETS wallets through invest / vote / refund calls until
+// roughly BENCH_EVENTS OpenFund events have been emitted. Every wallet
+// invests BENCH_ROUNDS times in each project, then everyone votes (so the
+// project fails) and claims a refund.
+//
+// BENCH_PHASE splits the run so a scanner can watch the chain in between:
+//   all     (default) everything below in one go
+//   setup   deploy and fund; no scanned events, state saved to BENCH_STATE
+//   invest  one investment round from every wallet in every project
+//   settle  votes, then refunds
+// invest and settle continue from the BENCH_STATE written by setup.
+//
+// npx hardhat run --network localhost scripts/scanner_bench_workload.js
+// Writes a JSON summary to BENCH_OUTPUT (default scanner_bench_workload.json).
+
+const fs = require("fs");
+const { ethers, network } = require("hardhat");
+
+const PHASE = process.env.BENCH_PHASE || "all";
+const EVENTS = parseInt(process.env.BENCH_EVENTS || "2000");
+const WALLETS = parseInt(process.env.BENCH_WALLETS || "100");
+const ROUNDS = Math.min(parseInt(process.env.BENCH_ROUNDS || "3"), 10);
+const OUTPUT = process.env.BENCH_OUTPUT || "scanner_bench_workload.json";
+const STATE = process.env.BENCH_STATE || "scanner_bench_state.json";
+
+const TOKEN_PRICE = 500000; // 0.5 USDT (decimal 6)
+const DECIMAL = 18;
+const DAY = 24 * 60 * 60;
+
+async function forAllWallets(wallets, send) {
+  // One transaction per wallet in flight at a time, all wallets in parallel
+  const txs = await Promise.all(wallets.map(send));
+  await Promise.all(txs.map((tx) => tx.wait()));
+}
+
+async function setup() {
+  const [owner, raiser] = await ethers.getSigners();
+  const provider = ethers.provider;
+
+  const eventsPerProject = WALLETS * (ROUNDS + 2);
+  const projects = Math.max(1, Math.ceil(EVENTS / eventsPerProject));
+  const tokensToSell = WALLETS * ROUNDS * 200;
+
+  const usdt = await (await ethers.getContractFactory("TestUSDT")).deploy();
+  // One token per project: vote weight and refunds are based on the
+  // investor's whole balance of the project's token
+  const projectTokens = [];
+  for (let i = 0; i < projects; i++) {
+    projectTokens.push(await (await ethers.getContractFactory("TestProjectToken")).deploy());
+  }
+  const openFund = await (await ethers.getContractFactory("OpenFund")).deploy(await usdt.getAddress());
+  const openFundAddress = await openFund.getAddress();
+  const startBlock = await provider.getBlockNumber();
+
+  const wallets = [];
+  for (let i = 0; i < WALLETS; i++) {
+    const wallet = ethers.Wallet.createRandom().connect(provider);
+    await network.provider.send("hardhat_setBalance", [wallet.address, "0x56BC75E2D63100000"]);
+    wallets.push(wallet);
+  }
+  for (const wallet of wallets) {
+    await usdt.mint(wallet.address, ethers.parseUnits(String(projects * ROUNDS * 100), 6));
+  }
+  await forAllWallets(wallets, (wallet) =>
+    usdt.connect(wallet).approve(openFundAddress, ethers.MaxUint256));
+  for (const projectToken of projectTokens) {
+    await forAllWallets(wallets, (wallet) =>
+      projectToken.connect(wallet).approve(openFundAddress, ethers.MaxUint256));
+  }
+
+  const latest = await provider.getBlock("latest");
+  const endFundingTime = latest.timestamp + 7 * DAY;
+  for (let projectId = 1; projectId <= projects; projectId++) {
+    const projectToken = projectTokens[projectId - 1];
+    await projectToken.transfer(raiser.address, ethers.parseUnits(String(tokensToSell), DECIMAL));
+    await projectToken.connect(raiser).approve(openFundAddress, ethers.MaxUint256);
+    await openFund.createProject(projectId, raiser.address, await projectToken.getAddress(),
+      tokensToSell, TOKEN_PRICE, endFundingTime, DECIMAL);
+    await openFund.connect(raiser).depositTokens(projectId);
+  }
+
+  return {
+    openfund_address: openFundAddress,
+    usdt_address: await usdt.getAddress(),
+    projects,
+    wallets: WALLETS,
+    wallet_keys: wallets.map((wallet) => wallet.privateKey),
+    end_funding_time: endFundingTime,
+    start_block: startBlock
+  };
+}
+
+async function load(state) {
+  return {
+    openFund: await ethers.getContractAt("OpenFund", state.openfund_address),
+    wallets: state.wallet_keys.map((key) => new ethers.Wallet(key, ethers.provider))
+  };
+}
+
+async function investRound(state, counts) {
+  const { openFund, wallets } = await load(state);
+  for (let projectId = 1; projectId <= state.projects; projectId++) {
+    await forAllWallets(wallets, (wallet) => openFund.connect(wallet).invest(projectId, 1));
+    counts.investment += wallets.length;
+  }
+}
+
+async function settle(state, counts) {
+  const { openFund, wallets } = await load(state);
+  await network.provider.send("evm_setNextBlockTimestamp", [state.end_funding_time + 1]);
+  for (let projectId = 1; projectId <= state.projects; projectId++) {
+    // Sequential: the vote that tips the project into FundingFailed must
+    // not race the others
+    for (const wallet of wallets) {
+      await (await openFund.connect(wallet).voteForRefund(projectId)).wait();
+    }
+    counts.vote += wallets.length;
+  }
+
+  await network.provider.send("evm_setNextBlockTimestamp", [state.end_funding_time + 3 * DAY + 1]);
+  await network.provider.send("evm_mine");
+  for (let projectId = 1; projectId <= state.projects; projectId++) {
+    await forAllWallets(wallets, (wallet) => openFund.connect(wallet).getRefund(projectId));
+    counts.get_refund += wallets.length;
+  }
+}
+
+async function main() {
+  const provider = ethers.provider;
+  const counts = { investment: 0, vote: 0, get_refund: 0 };
+  let state;
+  let startBlock;
+
+  if (PHASE === "all" || PHASE === "setup") {
+    state = await setup();
+    startBlock = state.start_block;
+    if (PHASE === "setup") {
+      fs.writeFileSync(STATE, JSON.stringify(state, null, 2));
+    }
+  } else {
+    state = JSON.parse(fs.readFileSync(STATE));
+    startBlock = (await provider.getBlockNumber()) + 1;
+  }
+
+  const started = Date.now();
+  if (PHASE === "all") {
+    for (let round = 0; round < ROUNDS; round++) {
+      await investRound(state, counts);
+    }
+    await settle(state, counts);
+  } else if (PHASE === "invest") {
+    await investRound(state, counts);
+  } else if (PHASE === "settle") {
+    await settle(state, counts);
+  } else if (PHASE !== "setup") {
+    throw new Error(`Unknown BENCH_PHASE ${PHASE}`);
+  }
+
+  const summary = {
+    phase: PHASE,
+    openfund_address: state.openfund_address,
+    usdt_address: state.usdt_address,
+    projects: state.projects,
+    wallets: state.wallets,
+    start_block: startBlock,
+    end_block: await provider.getBlockNumber(),
+    events: counts,
+    total_events: counts.investment + counts.vote + counts.get_refund,
+    workload_seconds: (Date.now() - started) / 1000
+  };
+  fs.writeFileSync(OUTPUT, JSON.stringify(summary, null, 2));
+  console.log(JSON.stringify(summary));
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exitCode = 1;
+});
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import change_listener
+
+MAX_ENTRIES = 10000
+
+# Below this many estimated rows an exact COUNT(*) is cheap enough (and the
+# planner estimate too rough) so approximate mode falls back to counting.
+APPROXIMATE_MIN_ROWS = 10000
+
+
+class CountCache:
+    """Pagination totals cached per (endpoint, filter key).
+
+    Entries expire after ttl seconds and are dropped early when a change
+    notification touches the rows they count.
+
+    A reader brackets its COUNT with begin_read() / end_read() and passes the
+    version from begin_read() to set(): if an invalidation for the key arrived
+    while the count ran, the total may already be stale and is not cached.
+    Versions are only kept for keys with a read in flight.
+    """
+
+    def __init__(self, ttl=60, max_entries=MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> [reads in flight, invalidations seen since the first began]
+        self._reads = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def begin_read(self, key):
+        with self._lock:
+            read = self._reads.setdefault(key, [0, 0])
+            read[0] += 1
+            return read[1]
+
+    def end_read(self, key):
+        with self._lock:
+            read = self._reads[key]
+            read[0] -= 1
+            if read[0] == 0:
+                del self._reads[key]
+
+    def set(self, key, value, version=None):
+        with self._lock:
+            if version is not None and (key not in self._reads or self._reads[key][1] != version):
+                return False
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, endpoint, filter_key=None):
+        """Drop one (endpoint, filter_key) total, or every total of the endpoint"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == endpoint and (filter_key is None or key[1] == filter_key):
+                    del self._entries[key]
+            for key, read in self._reads.items():
+                if key[0] == endpoint and (filter_key is None or key[1] == filter_key):
+                    read[1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for read in self._reads.values():
+                read[1] += 1
+
+
+cache = CountCache()
+
+
+def estimate_rows(cur, sql, params=()):
+    """Row count the planner expects sql to return (no table scan)"""
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_count(cur, endpoint, filter_key, from_sql, params=(), expression="*", approximate=False):
+    """Total for a paginated listing, served from the cache when possible.
+
+    from_sql is the FROM/WHERE part of the listing query. With approximate=True
+    large results are estimated from the query plan instead of counted.
+    """
+    key = (endpoint, filter_key)
+    total = cache.get(key)
+    if total is not None:
+        return total
+
+    if approximate:
+        approx_key = (endpoint, filter_key, "approximate")
+        total = cache.get(approx_key)
+        if total is not None:
+            return total
+        select = "SELECT 1" if expression == "*" else f"SELECT {expression}"
+        version = cache.begin_read(approx_key)
+        try:
+            estimate = estimate_rows(cur, f"{select} {from_sql}", params)
+            if estimate >= APPROXIMATE_MIN_ROWS:
+                cache.set(approx_key, estimate, version)
+                return estimate
+        finally:
+            cache.end_read(approx_key)
+
+    version = cache.begin_read(key)
+    try:
+        cur.execute(f"SELECT COUNT({expression}) {from_sql}", params)
+        total = cur.fetchone()[0]
+        cache.set(key, total, version)
+    finally:
+        cache.end_read(key)
+    return total
+
+
+def handle_change(event):
+    """Invalidate the totals that count the changed row"""
+    table = event.get("table")
+    if table == "*":
+        cache.clear()
+    elif table == "transaction":
+        investor_address = event.get("investor_address")
+        cache.invalidate("transactions", investor_address)
+        cache.invalidate("projects:invested", investor_address)
+    elif table == "project":
+        raiser_id = event.get("raiser_id")
+        cache.invalidate("raiser_projects", raiser_id)
+        cache.invalidate("submitted_projects", raiser_id)
+    elif table == "post":
+        cache.invalidate("blog")
+
+
+def init_app(app):
+    cache.ttl = float(os.getenv("COUNT_CACHE_TTL", "60"))
+    change_listener.subscribe(handle_change)
+    change_listener.init_app(app)
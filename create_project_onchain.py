@@ -3,6 +3,7 @@ import psycopg2
 from dotenv import load_dotenv
 import os
 import time
+import rpc
 
 load_dotenv(dotenv_path="config.env")
 OPENFUND_PRIVATEKEY = os.getenv("OPENFUND_PRIVATEKEY")
@@ -27,8 +28,18 @@ def get_db_connection():
         print(f"Database connection error: {e}")
         return None
 
+# Seconds between rounds (confirm receipts, then send new projects)
+LOOP_INTERVAL = 5
+# A transaction still unmined this long after its last broadcast is re-sent
+# with the same nonce and REPLACEMENT_BUMP times the gas price (nodes require
+# at least +10% to accept a replacement).
+STUCK_AFTER = 60
+REPLACEMENT_BUMP = 1.125
+RELEASE_AFTER_ROUNDS = 2
+CREATE_PROJECT_GAS = 2000000
+
 def get_pending_projects():
-    """Get all accepted projects that haven't been listed on chain yet"""
+    """Get all accepted projects that haven't been listed on chain yet and have no transaction in flight"""
     conn = get_db_connection()
     if not conn:
         return []
@@ -42,6 +53,8 @@ def get_pending_projects():
             FROM project
             WHERE 
                listing_status = 'accepted' AND funding_status = 'not listed'
+               AND NOT EXISTS (SELECT 1 FROM pending_onchain_tx t WHERE t.project_id = project.id)
+            ORDER BY id
         """
         cursor.execute(query)
         projects = cursor.fetchall()
@@ -52,79 +65,282 @@ def get_pending_projects():
     finally:
         conn.close()
 
-def update_project_status(project_id):
-    """Update project status after successful on-chain creation"""
+def get_tracked_transactions():
+    """Our pending createProject transactions, with the project data needed to re-sign them"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 
+                t.nonce, t.gas_price, t.tx_hashes, t.attempts,
+                extract(epoch from now() - t.updated_time),
+                p.id, p.funding_address, p.token_address, p.token_to_sell,
+                p.token_price, p.investment_end_time, p.decimal
+            FROM pending_onchain_tx t
+            JOIN project p ON p.id = t.project_id
+            WHERE t.status = 'pending' AND t.sender = %s
+            ORDER BY t.nonce
+        """, (deployer_address,))
+        return cursor.fetchall()
+    except psycopg2.Error as e:
+        print(f"Error fetching pending transactions: {e}")
+        return None
+    finally:
+        conn.close()
+
+def execute_statements(statements):
+    """Run (query, params) pairs in one transaction"""
     conn = get_db_connection()
     if not conn:
         return False
     
     try:
         cursor = conn.cursor()
-        query = """
-            UPDATE project 
-            SET funding_status = 'created'
-            WHERE id = %s
-        """
-        cursor.execute(query, (project_id,))
+        for query, params in statements:
+            cursor.execute(query, params)
         conn.commit()
         return True
     except psycopg2.Error as e:
-        print(f"Error updating project status: {e}")
+        print(f"Error updating pending transactions: {e}")
         conn.rollback()
         return False
     finally:
         conn.close()
 
-def create_project_onchain(project_data):
-    """Create a project on the blockchain"""
+def settle_transaction(project_id, tx_hash, succeeded):
+    """Record the mined transaction of a project, and list the project if it succeeded"""
+    statements = [("""
+        UPDATE pending_onchain_tx
+        SET status = %s, updated_time = CURRENT_TIMESTAMP
+        WHERE project_id = %s
+    """, ('confirmed' if succeeded else 'failed', project_id))]
+    if succeeded:
+        statements.append(("""
+            UPDATE project 
+            SET funding_status = 'created'
+            WHERE id = %s
+        """, (project_id,)))
+    if not execute_statements(statements):
+        return False
+    if succeeded:
+        print(f"Project {project_id} created on chain in {tx_hash}, status updated to 'created'")
+    else:
+        print(f"createProject for project {project_id} reverted ({tx_hash}); left for manual review")
+    return True
+
+class NonceManager:
+    """Hands out the deployer's nonces locally so transactions can be sent back
+    to back, skipping nonces still held by our own pending transactions."""
+
+    def __init__(self):
+        self.next_nonce = None
+
+    def allocate(self, chain_nonce, held):
+        if self.next_nonce is None or self.next_nonce < chain_nonce:
+            self.next_nonce = chain_nonce
+        while self.next_nonce in held:
+            self.next_nonce += 1
+        nonce = self.next_nonce
+        self.next_nonce += 1
+        return nonce
+
+    def reset(self):
+        """Forget the local counter, the next allocation starts from the chain again"""
+        self.next_nonce = None
+
+nonces = NonceManager()
+
+def sign_create_project(project_data, nonce, gas_price, chain_id):
+    """Signed createProject transaction for a project row"""
     project_id, raiser, token_address, tokens_to_sell, token_price, end_funding_time, token_decimals = project_data
     # Convert values to appropriate formats
     token_price_wei = int(float(token_price) * 10**6)
     tokens_to_sell = int(tokens_to_sell)
     token_decimals = int(token_decimals)
     
+    create_txn = open_fund_contract.functions.createProject(
+        project_id,
+        Web3.to_checksum_address(raiser),
+        Web3.to_checksum_address(token_address),
+        tokens_to_sell,
+        token_price_wei,
+        end_funding_time,
+        token_decimals
+    ).build_transaction({
+        'chainId': chain_id,
+        'gas': CREATE_PROJECT_GAS,
+        'gasPrice': gas_price,
+        'nonce': nonce,
+    })
+    return w3.eth.account.sign_transaction(create_txn, private_key=OPENFUND_PRIVATEKEY)
+
+# Node errors that mean the transaction was refused and can never be mined.
+# Anything else (a timeout, a dropped connection, a 5xx) may have reached the
+# mempool, so its nonce stays held until confirm_transactions() settles it.
+REJECTION_HINTS = ("nonce too low", "insufficient funds", "invalid", "intrinsic gas too low",
+                   "underpriced", "exceeds block gas limit")
+
+def broadcast(signed_txn):
+    """Send a signed transaction; a node that already has it counts as sent"""
     try:
-        # Get the current nonce
-        nonce = w3.eth.get_transaction_count(deployer_address)
-        
-        # Build the transaction
-        create_txn = open_fund_contract.functions.createProject(
-            project_id,
-            Web3.to_checksum_address(raiser),
-            Web3.to_checksum_address(token_address),
-            tokens_to_sell,
-            token_price_wei,
-            end_funding_time,
-            token_decimals
-        ).build_transaction({
-            'chainId': w3.eth.chain_id,
-            'gas': 2000000,
-            'gasPrice': w3.eth.gas_price,
-            'nonce': nonce,
-        })
-        
-        # Sign and send the transaction
-        signed_txn = w3.eth.account.sign_transaction(create_txn, private_key=OPENFUND_PRIVATEKEY)
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-        
-        # Wait for transaction receipt
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        print(f"Project created with ID: {project_id}")
-        print(f"Transaction hash: {tx_hash.hex()}")
-        
-        # Update project status in database
-        if update_project_status(project_id):
-            print(f"Project {project_id} status updated to 'created'")
-        else:
-            print(f"Failed to update project {project_id} status")
-        return True
-    except Exception as error:
-        print(f"Error creating project {project_id}: {str(error)}")
+        rpc.get_client().call("eth_sendRawTransaction", [Web3.to_hex(signed_txn.rawTransaction)])
+    except rpc.RPCError as error:
+        if "already known" not in (error.error_message or "").lower():
+            raise
+
+def is_rejected(error):
+    """Whether a broadcast error is the node refusing the transaction, as
+    opposed to a failure after which the node may still have accepted it"""
+    if not isinstance(error, rpc.RPCError):
         return False
+    message = (error.error_message or "").lower()
+    return any(hint in message for hint in REJECTION_HINTS)
+
+def submit_projects(projects, tracked):
+    """Send createProject for every project back to back, without waiting for receipts.
+
+    Each transaction is recorded in pending_onchain_tx before it is broadcast.
+    Sending stops at the first failure so no nonce gap is left behind. The
+    record is dropped only when the node rejects the transaction; after a
+    timeout or transport error it stays pending, and confirm_transactions()
+    settles it, replaces it once stuck, or releases the nonce if another
+    transaction took it.
+    """
+    chain_nonce, chain_id, gas_price = (rpc.to_int(value) for value in rpc.batch([
+        ("eth_getTransactionCount", [deployer_address, "pending"]),
+        ("eth_chainId", []),
+        ("eth_gasPrice", [])
+    ]))
+    held = {row[0] for row in tracked}
+    
+    sent = 0
+    for project in projects:
+        project_id = project[0]
+        nonce = nonces.allocate(chain_nonce, held)
+        try:
+            signed_txn = sign_create_project(project, nonce, gas_price, chain_id)
+        except Exception as error:
+            print(f"Error creating project {project_id}: {str(error)}")
+            nonces.reset()
+            break
+        tx_hash = Web3.to_hex(signed_txn.hash)
+        if not execute_statements([("""
+            INSERT INTO pending_onchain_tx (project_id, sender, nonce, gas_price, tx_hashes)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (project_id, deployer_address, nonce, gas_price, [tx_hash]))]):
+            nonces.reset()
+            break
+        try:
+            broadcast(signed_txn)
+        except Exception as error:
+            if is_rejected(error):
+                print(f"Error creating project {project_id}: {str(error)}")
+                execute_statements([("DELETE FROM pending_onchain_tx WHERE project_id = %s", (project_id,))])
+            else:
+                print(f"Error sending createProject for project {project_id} (nonce {nonce}), "
+                      f"keeping it pending until it is mined or released: {str(error)}")
+            nonces.reset()
+            break
+        print(f"Sent createProject for project {project_id} (nonce {nonce}): {tx_hash}")
+        sent += 1
+    return sent
+
+# Rounds in a row each project's nonce was behind the account nonce without
+# any of its receipts; it is only released after RELEASE_AFTER_ROUNDS, since
+# a lagging or load-balanced node can briefly serve a null receipt
+missing_receipt_rounds = {}
+
+def find_nonce_transaction(nonce):
+    """Hash of the transaction that used one of the deployer's nonces, or None
+    when the node cannot tell (ots_getTransactionBySenderAndNonce is an
+    Otterscan/Erigon extension)"""
+    try:
+        return rpc.get_client().call("ots_getTransactionBySenderAndNonce", [deployer_address, hex(nonce)])
+    except Exception:
+        return None
+
+def nonce_taken_by_other(nonce, tx_hashes):
+    """Whether the mined transaction at nonce is not one of ours"""
+    used_by = find_nonce_transaction(nonce)
+    if used_by:
+        return used_by.lower() not in {tx_hash.lower() for tx_hash in tx_hashes}
+    # Without the lookup, make sure the node knows none of our hashes
+    transactions = rpc.batch([("eth_getTransactionByHash", [tx_hash]) for tx_hash in tx_hashes])
+    return not any(transactions)
+
+def confirm_transactions(tracked):
+    """Settle mined transactions and fee-bump the stuck ones.
+
+    The account nonce is read first, on its own, and the receipts (every hash
+    ever broadcast for each nonce) after it in one JSON-RPC batch, so any
+    nonce below the account nonce was already mined when its receipts were
+    asked for. A nonce the chain has moved past is only released for
+    resending when none of our hashes has a receipt on RELEASE_AFTER_ROUNDS
+    consecutive rounds and the transaction that used it is not ours: a
+    duplicate createProject would overwrite the project on chain.
+    """
+    tracked_ids = {row[5] for row in tracked}
+    for project_id in list(missing_receipt_rounds):
+        if project_id not in tracked_ids:
+            del missing_receipt_rounds[project_id]
+    if not tracked:
+        return
+    mined_nonce = rpc.to_int(rpc.get_client().call("eth_getTransactionCount", [deployer_address, "latest"]))
+    calls = [("eth_getTransactionReceipt", [tx_hash]) for row in tracked for tx_hash in row[2]]
+    calls.append(("eth_gasPrice", []))
+    calls.append(("eth_chainId", []))
+    results = rpc.batch(calls)
+    gas_price, chain_id = (rpc.to_int(value) for value in results[-2:])
+    receipts = iter(results[:-2])
+    
+    for nonce, old_gas_price, tx_hashes, attempts, age, *project in tracked:
+        project_id = project[0]
+        mined = [(tx_hash, receipt) for tx_hash, receipt in zip(tx_hashes, receipts) if receipt]
+        if mined:
+            missing_receipt_rounds.pop(project_id, None)
+            tx_hash, receipt = mined[0]
+            settle_transaction(project_id, tx_hash, rpc.to_int(receipt["status"]) == 1)
+        elif nonce < mined_nonce:
+            rounds = missing_receipt_rounds.get(project_id, 0) + 1
+            missing_receipt_rounds[project_id] = rounds
+            if rounds < RELEASE_AFTER_ROUNDS:
+                print(f"Nonce {nonce} of project {project_id} is mined but no receipt yet, checking again")
+                continue
+            try:
+                taken = nonce_taken_by_other(nonce, tx_hashes)
+            except Exception as error:
+                print(f"Error looking up nonce {nonce} of project {project_id}: {str(error)}")
+                continue
+            if not taken:
+                print(f"Nonce {nonce} of project {project_id} was used by our transaction, waiting for its receipt")
+                continue
+            print(f"Nonce {nonce} of project {project_id} was used by another transaction, resending")
+            if execute_statements([("DELETE FROM pending_onchain_tx WHERE project_id = %s", (project_id,))]):
+                missing_receipt_rounds.pop(project_id, None)
+            nonces.reset()
+        elif age >= STUCK_AFTER:
+            missing_receipt_rounds.pop(project_id, None)
+            new_gas_price = max(gas_price, int(int(old_gas_price) * REPLACEMENT_BUMP) + 1)
+            try:
+                signed_txn = sign_create_project(project, nonce, new_gas_price, chain_id)
+                tx_hash = Web3.to_hex(signed_txn.hash)
+                if not execute_statements([("""
+                    UPDATE pending_onchain_tx
+                    SET gas_price = %s, tx_hashes = array_append(tx_hashes, %s),
+                        attempts = attempts + 1, updated_time = CURRENT_TIMESTAMP
+                    WHERE project_id = %s
+                """, (new_gas_price, tx_hash, project_id))]):
+                    continue
+                broadcast(signed_txn)
+                print(f"Replaced stuck createProject for project {project_id} (nonce {nonce}, attempt {attempts + 1}): {tx_hash}")
+            except Exception as error:
+                print(f"Error replacing transaction of project {project_id}: {str(error)}")
 
 # Setup blockchain connection
-provider_url = "https://evm-rpc-arctic-1.sei-apis.com"
-w3 = Web3(Web3.HTTPProvider(provider_url))
+w3 = rpc.get_web3()
 
 if not w3.is_connected():
     print("Failed to connect to the provider")
@@ -157,16 +373,17 @@ open_fund_contract = w3.eth.contract(address=open_fund_address, abi=open_fund_ab
 
 try:
     while True:
-        pending_projects = get_pending_projects()
-        if pending_projects:
-            print(f"Found {len(pending_projects)} pending projects to process")
-            for project in pending_projects:
-                create_project_onchain(project)
-        else:
-            print("No pending projects found")
-        print("Sleeping for 20 seconds...")
-        time.sleep(20)
+        try:
+            tracked = get_tracked_transactions()
+            if tracked is not None:
+                confirm_transactions(tracked)
+                pending_projects = get_pending_projects()
+                if pending_projects:
+                    print(f"Found {len(pending_projects)} pending projects to process")
+                    sent = submit_projects(pending_projects, get_tracked_transactions() or [])
+                    print(f"Sent {sent} of {len(pending_projects)} createProject transactions")
+        except Exception as e:
+            print(f"Error processing pending projects: {e}")
+        time.sleep(LOOP_INTERVAL)
 except KeyboardInterrupt:
     print("Script terminated by user")
-except Exception as e:
-    print(f"Error in main loop: {e}")
\ No newline at end of file
@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+import psycopg2
+from psycopg2 import extensions, pool
+from flask import g
+
+
+def connect():
+    """Open a dedicated (non pooled) connection, used by daemons and listeners"""
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT")
+    )
+
+
+class PooledConnection:
+    """Connection borrowed for the current request.
+
+    Handlers still call close() when they are done; that is a no-op here and
+    the real connection goes back to the pool on app context teardown.
+    `with conn:` commits or rolls back like on a plain psycopg2 connection.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def close(self):
+        pass
+
+    def reset_if_aborted(self):
+        """Roll back a transaction an earlier caller left aborted by a failed statement"""
+        if not self._conn.closed and \
+                self._conn.get_transaction_status() == extensions.TRANSACTION_STATUS_INERROR:
+            self._conn.rollback()
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class ConnectionPool:
+    """Thread-safe pool that blocks (up to a timeout) instead of failing when full"""
+
+    def __init__(self, minconn, maxconn, timeout):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._pool = pool.ThreadedConnectionPool(
+            0, maxconn,
+            dbname=os.getenv("DB_NAME"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            host=os.getenv("DB_HOST"),
+            port=os.getenv("DB_PORT")
+        )
+        # psycopg2 closes a returned connection once minconn are idle; open
+        # lazily (minconn=0 above) but keep every returned connection
+        self._pool.minconn = maxconn
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "discarded": 0,
+            "wait_time_total": 0.0
+        }
+
+    def warm(self):
+        """Open minconn connections up front so the first requests skip the handshake"""
+        conns = []
+        try:
+            for _ in range(self.minconn):
+                conns.append(self.getconn())
+        finally:
+            for conn in conns:
+                self.putconn(conn)
+
+    def getconn(self):
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise pool.PoolError("connection pool exhausted")
+        try:
+            conn = self._pool.getconn()
+            if conn.closed:
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += time.monotonic() - started
+        return conn
+
+    def putconn(self, conn):
+        close = bool(conn.closed)
+        if not close:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+        if close:
+            with self._lock:
+                self._stats["discarded"] += 1
+        try:
+            self._pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        in_use = len(self._pool._used)
+        idle = len(self._pool._pool)
+        stats.update({
+            "pid": self.pid,
+            "min_size": self.minconn,
+            "max_size": self.maxconn,
+            "in_use": in_use,
+            "idle": idle,
+            "size": in_use + idle
+        })
+        return stats
+
+    def closeall(self):
+        self._pool.closeall()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return this process' pool, creating it after a fork if needed"""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                # Every gunicorn worker owns its own pool, so the total number of
+                # server connections is roughly workers * DB_POOL_MAX.
+                _pool = ConnectionPool(
+                    int(os.getenv("DB_POOL_MIN", "2")),
+                    int(os.getenv("DB_POOL_MAX", "10")),
+                    float(os.getenv("DB_POOL_TIMEOUT", "10"))
+                )
+    return _pool
+
+
+def warm_pool():
+    try:
+        get_pool().warm()
+    except psycopg2.Error as e:
+        print(f"Database pool warm-up error: {e}")
+
+
+def pool_stats():
+    return get_pool().stats()
+
+
+def get_db_connection():
+    """Connection checked out for the current request, shared by every call in it.
+
+    A handler that caught a psycopg2.Error may have left the shared transaction
+    aborted; it is rolled back here so the next caller in the request gets a
+    usable connection.
+    """
+    if "db_conn" not in g:
+        g.db_conn = PooledConnection(get_pool().getconn())
+    else:
+        g.db_conn.reset_if_aborted()
+    return g.db_conn
+
+
+def release_db_connection(exception=None):
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        get_pool().putconn(conn._conn)
+
+
+def init_app(app):
+    app.teardown_appcontext(release_db_connection)
@@ -0,0 +1,14 @@
+# Shared gunicorn settings for the web app and the admin panel, e.g.
+#   gunicorn -c gunicorn.conf.py app:app
+#   cd openfund_admin && gunicorn -c ../gunicorn.conf.py app:app
+import os
+
+workers = int(os.getenv("GUNICORN_WORKERS", "3"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+
+def post_worker_init(worker):
+    # Each worker owns its own connection pool (capped by DB_POOL_MAX);
+    # open the first connections before the worker starts taking requests.
+    import db
+    db.warm_pool()
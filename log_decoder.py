@@ -0,0 +1,102 @@
+from web3 import Web3
+
+# Event layouts of contracts/OpenFund.sol: (name, [(argument, type, indexed), ...])
+OPENFUND_EVENTS = [
+    ("ProjectCreated", [("projectId", "uint256", True), ("raiser", "address", True),
+                        ("tokensToSell", "uint256", False), ("tokenPrice", "uint256", False),
+                        ("endFundingTime", "uint256", False)]),
+    ("TokensDeposited", [("projectId", "uint256", True), ("amount", "uint256", False)]),
+    ("InvestmentMade", [("projectId", "uint256", True), ("investor", "address", True),
+                        ("amount", "uint256", False), ("tokensToReceive", "uint256", False)]),
+    ("VoteCast", [("projectId", "uint256", True), ("voter", "address", True)]),
+    ("FundsClaimed", [("projectId", "uint256", True), ("amount", "uint256", False)]),
+    ("Refunded", [("projectId", "uint256", True), ("investor", "address", True),
+                  ("amount", "uint256", False)]),
+    ("UnsoldTokensClaimed", [("projectId", "uint256", True), ("amount", "uint256", False)]),
+    ("PlatformFeeClaimed", [("projectId", "uint256", True), ("amount", "uint256", False)]),
+    ("ProjectFailed", [("projectId", "uint256", False)])
+]
+
+
+class DecodedLog:
+    """One decoded OpenFund log.
+
+    Attribute names follow web3's event data (event.args, event.logIndex, ...)
+    so the scanner's row builders accept either. Addresses in args are
+    lower-case hex rather than checksummed: the scanner stores them lower-case.
+    """
+
+    __slots__ = ("event", "args", "blockNumber", "logIndex", "transactionHash")
+
+    def __init__(self, event, args, block_number, log_index, transaction_hash):
+        self.event = event
+        self.args = args
+        self.blockNumber = block_number
+        self.logIndex = log_index
+        self.transactionHash = transaction_hash
+
+    def __repr__(self):
+        return f"DecodedLog({self.event}, {self.args}, block {self.blockNumber}, log {self.logIndex})"
+
+
+def _word_to_value(kind):
+    if kind == "address":
+        return lambda word: "0x" + bytes.hex(word[12:])
+    if kind == "bool":
+        return lambda word: word[31] == 1
+    return lambda word: int.from_bytes(word, "big")
+
+
+class EventLayout:
+    """Precomputed topic 0 and argument slices of one event (static types only)"""
+
+    def __init__(self, name, inputs):
+        self.name = name
+        self.signature = f"{name}({','.join(kind for _, kind, _ in inputs)})"
+        self.topic = bytes(Web3.keccak(text=self.signature))
+        self.topic_hex = "0x" + self.topic.hex()
+        # Argument name, topic index (1-based) or data word offset, and converter
+        self.indexed = []
+        self.data = []
+        for argument, kind, indexed in inputs:
+            if indexed:
+                self.indexed.append((argument, len(self.indexed) + 1, _word_to_value(kind)))
+            else:
+                self.data.append((argument, 32 * len(self.data), _word_to_value(kind)))
+        self.topic_count = len(self.indexed) + 1
+        self.data_size = 32 * len(self.data)
+
+    def decode(self, log):
+        """DecodedLog for an eth_getLogs entry of this event, or None if it does not fit the layout"""
+        topics = log['topics']
+        data = log['data']
+        if len(topics) != self.topic_count or len(data) < self.data_size:
+            return None
+        args = {}
+        for argument, index, convert in self.indexed:
+            args[argument] = convert(topics[index])
+        for argument, offset, convert in self.data:
+            args[argument] = convert(data[offset:offset + 32])
+        return DecodedLog(self.name, args, log['blockNumber'], log['logIndex'], log['transactionHash'])
+
+
+EVENT_LAYOUTS = {name: EventLayout(name, inputs) for name, inputs in OPENFUND_EVENTS}
+LAYOUTS_BY_TOPIC = {layout.topic: layout for layout in EVENT_LAYOUTS.values()}
+
+
+def topic0(name):
+    """Hex topic 0 of an OpenFund event"""
+    return EVENT_LAYOUTS[name].topic_hex
+
+
+def decode_log(log, events=None):
+    """DecodedLog for an OpenFund log, None for anything else.
+
+    events optionally restricts decoding to a set of event names.
+    """
+    if not log['topics']:
+        return None
+    layout = LAYOUTS_BY_TOPIC.get(bytes(log['topics'][0]))
+    if layout is None or (events is not None and layout.name not in events):
+        return None
+    return layout.decode(log)
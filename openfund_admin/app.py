@@ -1,5 +1,6 @@
-from flask import Flask, render_template, request, session, url_for, redirect, flash
+from flask import Flask, render_template, request, session, url_for, redirect, flash, jsonify
 import os
+import sys
 import secrets
 from flask_cors import CORS
 import psycopg2
@@ -16,20 +17,21 @@ app.secret_key = "secretkey"
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ENV_PATH = os.path.join(BASE_DIR, '..', 'config.env')
 load_dotenv(dotenv_path=ENV_PATH)
+
+# Shared modules (connection pool, ...) live next to the main app
+sys.path.insert(0, os.path.join(BASE_DIR, '..'))
+import db
+from post_summary import summarize_post
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+db.init_app(app)
+
 def get_db_connection():
-   return psycopg2.connect(
-   dbname=DB_NAME,
-   user=DB_USER,
-   password=DB_PASSWORD,
-   host=DB_HOST,
-   port=DB_PORT
-   )
+   return db.get_db_connection()
 
 # Authentication helper functions
 def hash_password(password, salt=None):
@@ -425,7 +427,7 @@ def manage_posts():
     
     try:
         cur.execute("""
-            SELECT * FROM post
+            SELECT id, title, thumbnail_url, status, created_time, excerpt FROM post
             ORDER BY created_time DESC
         """)
         posts = cur.fetchall()
@@ -454,11 +456,13 @@ def new_post():
         conn = get_db_connection()
         cur = conn.cursor()
         
+        excerpt, reading_time, first_image_url = summarize_post(content)
+        
         try:
             cur.execute("""
-                INSERT INTO post (title, content, thumbnail_url, status)
-                VALUES (%s, %s, %s, %s)
-            """, (title, content, thumbnail_url, status))
+                INSERT INTO post (title, content, thumbnail_url, status, excerpt, reading_time, first_image_url)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (title, content, thumbnail_url, status, excerpt, reading_time, first_image_url))
             conn.commit()
             flash('Post created successfully', 'success')
             return redirect(url_for('manage_posts'))
@@ -503,15 +507,17 @@ def edit_post(post_id):
                 flash('All fields are required', 'danger')
                 return redirect(url_for('edit_post', post_id=post_id))
                 
+            excerpt, reading_time, first_image_url = summarize_post(content)
             conn = get_db_connection()
             cur = conn.cursor()
             
             try:
                 cur.execute("""
                     UPDATE post
-                    SET title = %s, content = %s, thumbnail_url = %s, status = %s
+                    SET title = %s, content = %s, thumbnail_url = %s, status = %s,
+                        excerpt = %s, reading_time = %s, first_image_url = %s
                     WHERE id = %s
-                """, (title, content, thumbnail_url, status, post_id))
+                """, (title, content, thumbnail_url, status, excerpt, reading_time, first_image_url, post_id))
                 conn.commit()
                 flash('Post updated successfully', 'success')
                 return redirect(url_for('manage_posts'))
@@ -542,6 +548,11 @@ def edit_post(post_id):
             
         return render_template('edit_post.html', post=post)
 
+@app.route('/pool-stats')
+@login_required
+def pool_stats():
+    return jsonify(db.pool_stats())
+
 # Custom template filters
 @app.template_filter('datetime')
 def datetime_format(value, format='%Y-%m-%d %H:%M'):
@@ -553,4 +564,5 @@ def datetime_format(value, format='%Y-%m-%d %H:%M'):
 
 # Main run function
 if __name__ == "__main__":
+    db.warm_pool()
     app.run(debug=True, host='0.0.0.0', port=5002)
\ No newline at end of file
@@ -0,0 +1,107 @@
+import base64
+import datetime
+import json
+import math
+import uuid
+from flask import request
+
+MAX_PER_PAGE = 50
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_key, row_id):
+    """Opaque cursor pointing just after the row with the given (sort_key, id)"""
+    if isinstance(sort_key, datetime.datetime):
+        sort_key = sort_key.isoformat()
+    raw = json.dumps([sort_key, str(row_id) if not isinstance(row_id, int) else row_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if isinstance(sort_key, str):
+            sort_key = datetime.datetime.fromisoformat(sort_key)
+        elif not isinstance(sort_key, (int, float)):
+            raise TypeError("unsupported sort key")
+        return sort_key, row_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def check_cursor(cursor, sort_type, id_type):
+    """cursor with its values checked against the listing's key types.
+
+    sort_type is datetime.datetime (a naive TIMESTAMP column) or float (a
+    rank), id_type int (SERIAL) or uuid.UUID. A cursor built for another
+    listing, or edited by hand, raises InvalidCursor instead of failing
+    later in SQL or in a comparison.
+    """
+    sort_key, row_id = cursor
+    if sort_type is datetime.datetime:
+        if not isinstance(sort_key, datetime.datetime) or sort_key.tzinfo is not None:
+            raise InvalidCursor("expected a timestamp sort key")
+    elif sort_type is float:
+        if isinstance(sort_key, bool) or not isinstance(sort_key, (int, float)) or not math.isfinite(sort_key):
+            raise InvalidCursor("expected a numeric sort key")
+        sort_key = float(sort_key)
+    if id_type is int:
+        if isinstance(row_id, bool) or not isinstance(row_id, int):
+            raise InvalidCursor("expected an integer id")
+    elif id_type is uuid.UUID:
+        try:
+            row_id = str(uuid.UUID(row_id))
+        except (ValueError, TypeError, AttributeError):
+            raise InvalidCursor("expected a UUID id")
+    return sort_key, row_id
+
+
+def get_page_args(sort_type=datetime.datetime, id_type=int):
+    """Read page/per_page/cursor from the query string.
+
+    When a cursor is given the page number is ignored and the query seeks on
+    (sort_key, id) instead of skipping rows with OFFSET. The cursor is checked
+    against sort_type and id_type (see check_cursor); pass None for a listing
+    that only knows its key types later and calls check_cursor itself.
+    """
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 5, type=int), 1), MAX_PER_PAGE)
+    cursor = request.args.get('cursor', '', type=str)
+    args = {
+        "page": page,
+        "per_page": per_page,
+        "offset": (page - 1) * per_page,
+        "cursor": None
+    }
+    if cursor:
+        args["cursor"] = decode_cursor(cursor)
+        if sort_type is not None:
+            args["cursor"] = check_cursor(args["cursor"], sort_type, id_type)
+    return args
+
+
+def keyset_sql(args, sort_column, id_column):
+    """Seek condition (to append after WHERE) and its params for cursor mode"""
+    if args["cursor"] is None:
+        return "", []
+    return f"AND ({sort_column}, {id_column}) < (%s, %s)", list(args["cursor"])
+
+
+def limit_sql(args):
+    """LIMIT clause fetching one look-ahead row so we know whether a next page exists"""
+    if args["cursor"] is None:
+        return "LIMIT %s OFFSET %s", [args["per_page"] + 1, args["offset"]]
+    return "LIMIT %s", [args["per_page"] + 1]
+
+
+def split_page(rows, args, key):
+    """Drop the look-ahead row and build next_cursor from the last row kept"""
+    per_page = args["per_page"]
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -0,0 +1,42 @@
+import math
+from html.parser import HTMLParser
+
+EXCERPT_LENGTH = 120
+WORDS_PER_MINUTE = 200
+
+
+class _PostTextParser(HTMLParser):
+    """Collects the visible text and the first image of a post body"""
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.first_image_url = None
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip_depth += 1
+        elif tag == 'img' and self.first_image_url is None:
+            self.first_image_url = dict(attrs).get('src') or None
+        elif tag in ('p', 'br', 'div', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def summarize_post(content):
+    """(excerpt, reading_time, first_image_url) computed once when a post is saved"""
+    parser = _PostTextParser()
+    parser.feed(content or '')
+    parser.close()
+    text = ' '.join(''.join(parser.parts).split())
+    excerpt = text[:EXCERPT_LENGTH] + ('...' if len(text) > EXCERPT_LENGTH else '')
+    reading_time = max(1, math.ceil(len(text.split()) / WORDS_PER_MINUTE))
+    return excerpt, reading_time, parser.first_image_url
@@ -0,0 +1,289 @@
+"""Fail when a hot query is no longer served by the index meant for it.
+
+Creates a throwaway database (CHECK_DB_NAME, dropped afterwards unless
+--keep-db), applies create_tables.sql and the migrations, fills it with
+synthetic rows and runs EXPLAIN on every query in HOT_QUERIES. Each plan must
+read its main table through the index named next to the query, with an
+index scan node; a sequential scan, or a scan of some other index (a full
+walk of the primary key, say), is a failure. The seed rows are shaped so
+each filter is selective, and plans are costed normally (no enable_seqscan
+override), so a failure means the planner would really not use the index. The database named in config.env is
+only used to create and drop the throwaway one.
+
+Usage: python postgre/check_query_plans.py [--keep-db]
+Exit status is 1 if any plan does not use its index.
+"""
+import json
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(dotenv_path=os.path.join(BASE_DIR, '..', 'config.env'))
+sys.path.insert(0, os.path.join(BASE_DIR, '..'))
+import db
+import migrate
+
+CHECK_DB_NAME = "openfund_query_plans"
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+INVESTOR = '0x00000000000000000000000000000000000000aa'
+
+# name -> (query, params, index that must serve it). Where two indexes both
+# return rows in the listing's order with no sort (a status index, or the
+# wider created_time one with a filter), either is accepted.
+HOT_QUERIES = {
+    "get_projects active page": ("""
+        SELECT p.id, p.name, p.funding_status, p.fund_raised, p.investment_end_time,
+               CONCAT(r.first_name, ' ', r.last_name), p.logo_url, p.created_time
+        FROM project p
+        JOIN raiser r ON p.raiser_id = r.id
+        WHERE p.funding_status IN ('raising', 'voting')
+        AND p.listing_status = 'accepted'
+        AND p.hidden = FALSE
+        ORDER BY p.created_time DESC, p.id DESC
+        LIMIT 6 OFFSET 0
+    """, (), ("project_listed_status_created_idx", "project_listing_created_idx")),
+    "get_projects active count": ("""
+        SELECT COUNT(*) FROM project
+        WHERE funding_status IN ('raising', 'voting')
+        AND listing_status = 'accepted'
+        AND hidden = FALSE
+    """, (), "project_listed_status_created_idx"),
+    "get_projects completed keyset": ("""
+        SELECT p.id, p.name, p.created_time
+        FROM project p
+        JOIN raiser r ON p.raiser_id = r.id
+        WHERE p.funding_status IN ('completed', 'failed')
+        AND p.listing_status = 'accepted'
+        AND p.hidden = FALSE
+        AND (p.created_time, p.id) < (CURRENT_TIMESTAMP, 1000)
+        ORDER BY p.created_time DESC, p.id DESC
+        LIMIT 6
+    """, (), ("project_listed_status_created_idx", "project_listing_created_idx")),
+    "get_projects invested page": ("""
+        SELECT p.id, p.name, p.created_time
+        FROM investor_position ip
+        JOIN project p ON p.id = ip.project_id
+        JOIN raiser r ON p.raiser_id = r.id
+        WHERE ip.investor_address = %s
+        ORDER BY p.created_time DESC, p.id DESC
+        LIMIT 6 OFFSET 0
+    """, (INVESTOR,), "investor_position_pkey"),
+    "get_projects invested count": ("""
+        SELECT COUNT(*) FROM investor_position WHERE investor_address = %s
+    """, (INVESTOR,), "investor_position_pkey"),
+    "transactions page": ("""
+        SELECT t.id, t.amount, t.transaction_time, p.name
+        FROM transaction t
+        JOIN project p ON t.project_id = p.id
+        WHERE t.investor_address = %s
+        ORDER BY t.transaction_time DESC, t.id DESC
+        LIMIT 6 OFFSET 0
+    """, (INVESTOR,), "transaction_investor_time_idx"),
+    "transactions count": ("""
+        SELECT COUNT(*) FROM transaction WHERE investor_address = %s
+    """, (INVESTOR,), "transaction_investor_time_idx"),
+    "raiser projects page": ("""
+        SELECT id, name, created_time
+        FROM project
+        WHERE raiser_id = (SELECT id FROM raiser ORDER BY id LIMIT 1)
+        AND listing_status = 'accepted' AND hidden = FALSE
+        ORDER BY created_time DESC, id DESC
+        LIMIT 6 OFFSET 0
+    """, (), "project_raiser_created_idx"),
+    "submitted projects page": ("""
+        SELECT id, name, created_time
+        FROM project
+        WHERE raiser_id = (SELECT id FROM raiser ORDER BY id LIMIT 1)
+        ORDER BY created_time DESC, id DESC
+        LIMIT 6 OFFSET 0
+    """, (), "project_raiser_created_idx"),
+    "project liked check": ("""
+        SELECT id FROM project_like
+        WHERE project_id = 1 AND investor_id = (SELECT id FROM investor ORDER BY id LIMIT 1)
+    """, (), "project_like_project_investor_key"),
+    "blog posts page": ("""
+        SELECT id, title, created_time, thumbnail_url
+        FROM post
+        WHERE status = 'posted'
+        ORDER BY created_time DESC, id DESC
+        LIMIT 6 OFFSET 0
+    """, (), ("post_posted_created_idx", "post_created_idx")),
+    "blog full-text search": ("""
+        SELECT id, ts_rank(search_vector, websearch_to_tsquery('english', 'topic7')) AS rank
+        FROM post
+        WHERE status = 'posted'
+        AND search_vector @@ websearch_to_tsquery('english', 'topic7')
+        ORDER BY rank DESC, id DESC
+        LIMIT 6
+    """, (), "post_search_vector_idx"),
+    "blog title search": ("""
+        SELECT id, title FROM post
+        WHERE status = 'posted' AND title ILIKE '%%ost 12%%'
+        ORDER BY created_time DESC, id DESC
+        LIMIT 6
+    """, (), "post_title_trgm_idx"),
+    "admin review queue": ("""
+        SELECT p.id, r.username
+        FROM project p
+        JOIN raiser r ON p.raiser_id = r.id
+        WHERE p.listing_status = 'pending'
+        ORDER BY p.created_time DESC
+    """, (), "project_listing_created_idx"),
+    "admin project investors": ("""
+        SELECT COUNT(DISTINCT investor_address) FROM transaction
+        WHERE project_id = 1 AND type = 'investment'
+    """, (), "transaction_project_type_idx"),
+    "admin dashboard volume": ("""
+        SELECT COALESCE(SUM(amount), 0) FROM transaction
+        WHERE transaction_time >= (CURRENT_TIMESTAMP - INTERVAL '30 days')
+    """, (), "transaction_time_idx"),
+    "update_project_cronjob active projects": ("""
+        SELECT id, funding_status, investment_end_time
+        FROM project
+        WHERE funding_status IN ('raising', 'voting', 'created', 'failed')
+        AND listing_status = 'accepted'
+        AND watch_until > floor(extract(epoch from now()))::bigint
+    """, (), "project_watch_until_idx"),
+    "create_project_onchain pending": ("""
+        SELECT id, funding_address, token_address
+        FROM project
+        WHERE listing_status = 'accepted' AND funding_status = 'not listed'
+        AND NOT EXISTS (SELECT 1 FROM pending_onchain_tx t WHERE t.project_id = project.id)
+        ORDER BY id
+    """, (), "project_not_listed_idx"),
+}
+
+SEED_SQL = """
+INSERT INTO raiser (username, first_name, email, hashed_password, salt, wallet_address)
+SELECT 'raiser' || g, 'Raiser', 'raiser' || g || '@example.com', 'x', 'x', '0xraiser' || g
+FROM generate_series(1, 2000) g;
+
+INSERT INTO investor (wallet_address)
+SELECT '0x' || lpad(to_hex(g), 40, '0') FROM generate_series(1, 20000) g;
+
+INSERT INTO project (raiser_id, name, token_name, token_symbol, investment_end_time,
+                     created_time, listing_status, hidden, funding_status,
+                     total_token_supply, token_to_sell, token_price, token_address,
+                     funding_address, fund_raised, token_sold, decimal,
+                     vote_for_refund, description, platform_comment)
+SELECT r.ids[1 + g % 2000],
+       'Project ' || g, 'Token', 'TKN', extract(epoch from now())::bigint - (50000 - g) * 3600,
+       now() - (g || ' minutes')::interval,
+       CASE WHEN g % 10 = 0 THEN 'pending' ELSE 'accepted' END,
+       g % 50 = 0,
+       (ARRAY['not listed', 'created', 'raising', 'voting', 'failed', 'completed'])[1 + g % 6],
+       1000000, 100000, 0.1, '0xtoken', '0xfunding', 0, 0, 18, 0, 'Description', 'Reviewing'
+FROM generate_series(1, 50000) g, (SELECT array_agg(id) AS ids FROM raiser) r;
+
+INSERT INTO transaction (project_id, investor_address, amount, token_received,
+                         transaction_time, transaction_hash, type)
+SELECT 1 + g % 50000, '0x' || lpad(to_hex(1 + g % 20000), 40, '0'), 10, 100,
+       now() - (g || ' minutes')::interval, '0xhash' || g,
+       (ARRAY['investment', 'investment', 'vote', 'get_refund'])[1 + g % 4]
+FROM generate_series(1, 400000) g;
+
+INSERT INTO investor_position (investor_address, project_id, amount_invested, tokens_received, last_activity_time)
+SELECT investor_address, project_id, SUM(amount), SUM(token_received), MAX(transaction_time)
+FROM transaction
+GROUP BY investor_address, project_id;
+
+INSERT INTO post (title, content, created_time, thumbnail_url, status)
+SELECT 'Post ' || g, repeat('Content ', 200) || ' topic' || g % 100, now() - (g || ' hours')::interval,
+       'https://example.com/thumb.png', CASE WHEN g % 5 = 0 THEN 'draft' ELSE 'posted' END
+FROM generate_series(1, 5000) g;
+
+INSERT INTO project_like (project_id, investor_id)
+SELECT 1 + g % 50000, i.ids[1 + g % 20000]
+FROM generate_series(1, 20000) g, (SELECT array_agg(id) AS ids FROM investor) i;
+"""
+
+
+def find_index_scans(plan):
+    """(node type, index name) of every index scan in the plan tree"""
+    found = []
+    if plan.get("Node Type") in INDEX_SCANS:
+        found.append((plan["Node Type"], plan.get("Index Name")))
+    for child in plan.get("Plans", []):
+        found.extend(find_index_scans(child))
+    return found
+
+
+def admin_execute(sql):
+    conn = db.connect()
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    cur = conn.cursor()
+    cur.execute(sql)
+    cur.close()
+    conn.close()
+
+
+def create_database():
+    """Fresh CHECK_DB_NAME with the full schema and seed rows; DB_NAME points at it afterwards"""
+    admin_execute(f"DROP DATABASE IF EXISTS {CHECK_DB_NAME}")
+    admin_execute(f"CREATE DATABASE {CHECK_DB_NAME}")
+    os.environ["DB_NAME"] = CHECK_DB_NAME
+
+    conn = db.connect()
+    try:
+        cur = conn.cursor()
+        with open(os.path.join(BASE_DIR, 'create_tables.sql')) as f:
+            cur.execute(f.read())
+        conn.commit()
+    finally:
+        conn.close()
+    migrate.migrate()
+
+    conn = db.connect()
+    try:
+        cur = conn.cursor()
+        cur.execute(SEED_SQL)
+        conn.commit()
+        # VACUUM sets the visibility map, so index-only scans are costed as in production
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        cur.execute("VACUUM ANALYZE")
+    finally:
+        conn.close()
+
+
+def check_plans(cur):
+    failures = 0
+    for name, (sql, params, index_names) in HOT_QUERIES.items():
+        if isinstance(index_names, str):
+            index_names = (index_names,)
+        cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        index_scans = find_index_scans(plan[0]["Plan"])
+        if any(scan_index in index_names for _, scan_index in index_scans):
+            print(f"ok   {name}")
+        else:
+            failures += 1
+            used = ", ".join(f"{node} on {scan_index}" for node, scan_index in index_scans) or "no index"
+            print(f"FAIL {name}: expected a scan of {' or '.join(index_names)}, plan uses {used}")
+    return failures
+
+
+def main():
+    admin_db_name = os.getenv("DB_NAME")
+    try:
+        create_database()
+        conn = db.connect()
+        try:
+            failures = check_plans(conn.cursor())
+            conn.rollback()
+        finally:
+            conn.close()
+    finally:
+        if '--keep-db' not in sys.argv:
+            os.environ["DB_NAME"] = admin_db_name
+            admin_execute(f"DROP DATABASE IF EXISTS {CHECK_DB_NAME}")
+    if failures:
+        print(f"{failures} of {len(HOT_QUERIES)} hot queries are not served by their index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Apply postgre/migrations/*.sql in version order, each exactly once.
+
+Usage: python postgre/migrate.py [--list]
+"""
+import glob
+import os
+import sys
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(BASE_DIR, 'migrations')
+load_dotenv(dotenv_path=os.path.join(BASE_DIR, '..', 'config.env'))
+sys.path.insert(0, os.path.join(BASE_DIR, '..'))
+import db
+
+
+def get_migrations():
+    """(version, path) for every migration file, oldest first"""
+    paths = sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '*.sql')))
+    return [(os.path.splitext(os.path.basename(path))[0], path) for path in paths]
+
+
+def get_applied_versions(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(255) PRIMARY KEY,
+            applied_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def migrate(list_only=False):
+    conn = db.connect()
+    try:
+        cur = conn.cursor()
+        applied = get_applied_versions(cur)
+        conn.commit()
+
+        for version, path in get_migrations():
+            if version in applied:
+                print(f"[applied] {version}")
+                continue
+            if list_only:
+                print(f"[pending] {version}")
+                continue
+            with open(path, 'r') as f:
+                sql = f.read()
+            # Each migration and its bookkeeping row commit together
+            cur.execute(sql)
+            cur.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+            conn.commit()
+            print(f"[done]    {version}")
+        cur.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    migrate(list_only='--list' in sys.argv)
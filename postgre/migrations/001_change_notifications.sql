@@ -0,0 +1,47 @@
+-- Publish row changes on the openfund_changes channel so the web workers can
+-- drop cached data (counts, listings, ...) as soon as the underlying rows
+-- change instead of waiting for a TTL.
+--
+-- Payload: {"table": ..., "op": ..., "id": ..., <columns listed in the trigger args>}
+-- Updates that do not change any column are not published.
+
+CREATE OR REPLACE FUNCTION notify_change() RETURNS trigger AS $$
+DECLARE
+    rec jsonb;
+    payload jsonb;
+    i int;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := to_jsonb(OLD);
+    ELSE
+        rec := to_jsonb(NEW);
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND to_jsonb(OLD) = rec THEN
+        RETURN NULL;
+    END IF;
+
+    payload := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'id', rec->'id');
+    FOR i IN 0 .. TG_NARGS - 1 LOOP
+        payload := payload || jsonb_build_object(TG_ARGV[i], rec->TG_ARGV[i]);
+    END LOOP;
+
+    PERFORM pg_notify('openfund_changes', payload::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS project_notify_change ON project;
+CREATE TRIGGER project_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON project
+    FOR EACH ROW EXECUTE FUNCTION notify_change('raiser_id');
+
+DROP TRIGGER IF EXISTS transaction_notify_change ON transaction;
+CREATE TRIGGER transaction_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON transaction
+    FOR EACH ROW EXECUTE FUNCTION notify_change('project_id', 'investor_address');
+
+DROP TRIGGER IF EXISTS post_notify_change ON post;
+CREATE TRIGGER post_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON post
+    FOR EACH ROW EXECUTE FUNCTION notify_change('status');
@@ -0,0 +1,46 @@
+-- Secondary indexes for the filters and orderings used by app.py,
+-- openfund_admin/app.py and the cronjobs. Checked by
+-- postgre/check_query_plans.py, keep both in sync when adding queries.
+
+-- /api/transactions (listing, keyset and count), "invested" tab join
+CREATE INDEX IF NOT EXISTS transaction_investor_time_idx
+    ON transaction (investor_address, transaction_time DESC, id DESC);
+
+-- admin project view: distinct investors / voters per project
+CREATE INDEX IF NOT EXISTS transaction_project_type_idx
+    ON transaction (project_id, type, investor_address);
+
+-- admin dashboard: last 30 days volume and active users
+CREATE INDEX IF NOT EXISTS transaction_time_idx
+    ON transaction (transaction_time);
+
+-- /api/get-projects active and completed tabs (listing, keyset and count)
+CREATE INDEX IF NOT EXISTS project_listed_status_created_idx
+    ON project (funding_status, created_time DESC, id DESC)
+    WHERE listing_status = 'accepted' AND hidden = FALSE;
+
+-- /api/submitted-projects, /api/get-raiser-projects, raiser profile count
+CREATE INDEX IF NOT EXISTS project_raiser_created_idx
+    ON project (raiser_id, created_time DESC, id DESC);
+
+-- admin review queue and accepted projects management
+CREATE INDEX IF NOT EXISTS project_listing_created_idx
+    ON project (listing_status, created_time DESC);
+
+-- create_project_onchain.py: accepted projects waiting to be listed on chain
+CREATE INDEX IF NOT EXISTS project_not_listed_idx
+    ON project (id)
+    WHERE listing_status = 'accepted' AND funding_status = 'not listed';
+
+-- project page like count and liked check
+CREATE INDEX IF NOT EXISTS project_like_project_investor_idx
+    ON project_like (project_id, investor_id);
+
+-- /api/blog/posts listing (page and keyset)
+CREATE INDEX IF NOT EXISTS post_posted_created_idx
+    ON post (created_time DESC, id DESC)
+    WHERE status = 'posted';
+
+-- admin posts management
+CREATE INDEX IF NOT EXISTS post_created_idx
+    ON post (created_time DESC);
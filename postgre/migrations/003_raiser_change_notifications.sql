@@ -0,0 +1,7 @@
+-- Raiser names are denormalized into the in-memory project catalog, so
+-- publish raiser changes on the same channel as project changes (001).
+
+DROP TRIGGER IF EXISTS raiser_notify_change ON raiser;
+CREATE TRIGGER raiser_notify_change
+    AFTER UPDATE OR DELETE ON raiser
+    FOR EACH ROW EXECUTE FUNCTION notify_change();
@@ -0,0 +1,37 @@
+-- One like per (project, investor) and a maintained like counter on project,
+-- so project pages read likes in O(1) and concurrent clicks cannot double-like.
+
+DELETE FROM project_like a
+USING project_like b
+WHERE a.project_id = b.project_id
+AND a.investor_id = b.investor_id
+AND a.id > b.id;
+
+ALTER TABLE project_like
+    ADD CONSTRAINT project_like_project_investor_key UNIQUE (project_id, investor_id);
+
+-- Superseded by the unique constraint's index
+DROP INDEX IF EXISTS project_like_project_investor_idx;
+
+ALTER TABLE project ADD COLUMN IF NOT EXISTS like_count INT NOT NULL DEFAULT 0;
+
+UPDATE project p
+SET like_count = l.count
+FROM (SELECT project_id, COUNT(*) AS count FROM project_like GROUP BY project_id) l
+WHERE p.id = l.project_id;
+
+CREATE OR REPLACE FUNCTION project_like_count_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE project SET like_count = like_count + 1 WHERE id = NEW.project_id;
+    ELSE
+        UPDATE project SET like_count = like_count - 1 WHERE id = OLD.project_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS project_like_count_change ON project_like;
+CREATE TRIGGER project_like_count_change
+    AFTER INSERT OR DELETE ON project_like
+    FOR EACH ROW EXECUTE FUNCTION project_like_count_change();
@@ -0,0 +1,30 @@
+-- One row per (investor, project), maintained by scanner_transaction_cronjob.py
+-- as it ingests InvestmentMade / VoteCast / Refunded, so portfolio listings
+-- and counts no longer aggregate the investor's whole transaction history.
+
+CREATE TABLE IF NOT EXISTS investor_position (
+    investor_address VARCHAR(255) NOT NULL,
+    project_id INT NOT NULL,
+    amount_invested NUMERIC NOT NULL DEFAULT 0,
+    tokens_received NUMERIC NOT NULL DEFAULT 0,
+    amount_refunded NUMERIC NOT NULL DEFAULT 0,
+    voted BOOLEAN NOT NULL DEFAULT FALSE,
+    refunded BOOLEAN NOT NULL DEFAULT FALSE,
+    last_activity_time TIMESTAMP NOT NULL,
+    PRIMARY KEY (investor_address, project_id),
+    FOREIGN KEY (project_id) REFERENCES project(id) ON DELETE CASCADE,
+    FOREIGN KEY (investor_address) REFERENCES investor(wallet_address) ON DELETE CASCADE
+);
+
+INSERT INTO investor_position (investor_address, project_id, amount_invested, tokens_received,
+                               amount_refunded, voted, refunded, last_activity_time)
+SELECT investor_address, project_id,
+       COALESCE(SUM(amount) FILTER (WHERE type = 'investment'), 0),
+       COALESCE(SUM(token_received) FILTER (WHERE type = 'investment'), 0),
+       COALESCE(SUM(amount) FILTER (WHERE type = 'get_refund'), 0),
+       bool_or(type = 'vote'),
+       bool_or(type = 'get_refund'),
+       MAX(transaction_time)
+FROM transaction
+GROUP BY investor_address, project_id
+ON CONFLICT (investor_address, project_id) DO NOTHING;
@@ -0,0 +1,27 @@
+-- Ranked full-text search for the blog: a weighted tsvector (title > content)
+-- kept current by trigger, plus a trigram index on title for short or
+-- partial queries that full-text matching cannot serve.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION post_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', regexp_replace(coalesce(NEW.content, ''), '<[^>]*>', ' ', 'g')), 'B');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS post_search_vector_update ON post;
+CREATE TRIGGER post_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, content ON post
+    FOR EACH ROW EXECUTE FUNCTION post_search_vector_update();
+
+UPDATE post SET title = title;
+
+CREATE INDEX IF NOT EXISTS post_search_vector_idx ON post USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS post_title_trgm_idx ON post USING GIN (title gin_trgm_ops);
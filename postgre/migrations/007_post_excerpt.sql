@@ -0,0 +1,20 @@
+-- Listing fields computed once when a post is saved (post_summary.py, called
+-- from the admin panel) so /api/blog/posts never ships or detoasts post bodies.
+-- The backfill below is a close SQL approximation of summarize_post().
+
+ALTER TABLE post ADD COLUMN IF NOT EXISTS excerpt TEXT NOT NULL DEFAULT '';
+ALTER TABLE post ADD COLUMN IF NOT EXISTS reading_time INT NOT NULL DEFAULT 1;
+ALTER TABLE post ADD COLUMN IF NOT EXISTS first_image_url TEXT;
+
+WITH text AS (
+    SELECT id,
+           content,
+           btrim(regexp_replace(regexp_replace(content, '<[^>]*>', ' ', 'g'), '\s+', ' ', 'g')) AS body
+    FROM post
+)
+UPDATE post p
+SET excerpt = left(t.body, 120) || CASE WHEN length(t.body) > 120 THEN '...' ELSE '' END,
+    reading_time = GREATEST(1, ceil(coalesce(array_length(regexp_split_to_array(nullif(t.body, ''), ' '), 1), 0) / 200.0)),
+    first_image_url = substring(t.content from '<img[^>]*src="([^"]+)"')
+FROM text t
+WHERE p.id = t.id;
@@ -0,0 +1,16 @@
+-- Exactly-once ingestion for scanner_transaction_cronjob.py: the scan cursor
+-- lives in the database and is advanced in the same transaction as the event
+-- rows, and each log can only be inserted once, so re-scanning a range is a
+-- no-op. (Rows ingested before this migration have no log_index.)
+
+CREATE TABLE IF NOT EXISTS scanner_checkpoint (
+    name VARCHAR(100) PRIMARY KEY,
+    last_block BIGINT NOT NULL,
+    updated_time TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE transaction ADD COLUMN IF NOT EXISTS log_index INT;
+
+ALTER TABLE transaction DROP CONSTRAINT IF EXISTS transaction_hash_log_index_key;
+ALTER TABLE transaction
+    ADD CONSTRAINT transaction_hash_log_index_key UNIQUE (transaction_hash, log_index);
@@ -0,0 +1,4 @@
+-- Block range size the transaction scanner has learned for eth_getLogs, kept
+-- next to the checkpoint so a restart does not start probing from scratch.
+
+ALTER TABLE scanner_checkpoint ADD COLUMN IF NOT EXISTS chunk_size INT;
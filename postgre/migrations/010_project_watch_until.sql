@@ -0,0 +1,13 @@
+-- End of the window in which update_project_cronjob.py keeps polling a
+-- project on chain (refund period end, investment_end_time + 4 days), stored
+-- so the per-second active-project selection is an index range scan instead
+-- of evaluating an expression over every listed project. Being a generated
+-- column it follows investment_end_time on insert and every edit.
+
+ALTER TABLE project ADD COLUMN IF NOT EXISTS watch_until bigint
+    GENERATED ALWAYS AS (investment_end_time + 4 * 24 * 60 * 60) STORED;
+
+CREATE INDEX IF NOT EXISTS project_watch_until_idx
+    ON project (watch_until)
+    WHERE listing_status = 'accepted'
+    AND funding_status IN ('created', 'raising', 'voting', 'failed');
@@ -0,0 +1,22 @@
+-- createProject transactions sent by create_project_onchain.py and not yet
+-- settled. Rows are written before the transaction is broadcast, so a
+-- restart neither re-sends a project nor loses track of a nonce; every hash
+-- broadcast for the nonce (fee replacements included) is kept because any
+-- one of them may be the one that gets mined.
+
+CREATE TABLE IF NOT EXISTS pending_onchain_tx (
+    project_id INT PRIMARY KEY,
+    sender VARCHAR(42) NOT NULL,
+    nonce BIGINT NOT NULL,
+    gas_price NUMERIC(78, 0) NOT NULL,
+    tx_hashes TEXT[] NOT NULL,
+    attempts INT NOT NULL DEFAULT 1,
+    status VARCHAR(20) NOT NULL CHECK (status IN ('pending', 'confirmed', 'failed')) DEFAULT 'pending',
+    sent_time TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_time TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (project_id) REFERENCES project(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS pending_onchain_tx_pending_idx
+    ON pending_onchain_tx (sender, nonce)
+    WHERE status = 'pending';
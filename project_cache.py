@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import change_listener
+
+MAX_ENTRIES = 5000
+
+DETAIL_SQL = """
+    SELECT p.id, p.name, p.token_name, p.token_symbol, p.logo_url, p.investment_end_time,
+    p.funding_status, p.total_token_supply, p.token_to_sell, p.token_price, p.token_address,
+    p.fund_raised, p.token_sold, p.decimal, p.vote_for_refund,
+    p.x_link, p.website_link, p.telegram_link, p.whitepaper_link, p.description,
+    CONCAT(r.first_name, ' ', r.last_name) AS raiser_name, r.username, p.like_count, p.raiser_id
+    FROM project p
+    JOIN raiser r ON p.raiser_id = r.id
+    WHERE p.id = %s AND p.listing_status = 'accepted'
+"""
+
+
+class ProjectDetailCache:
+    """Session-independent part of the project page, keyed by project id.
+
+    The cronjob rewrites project rows constantly, but the change trigger only
+    publishes updates that actually modify a column, so an entry lives until
+    the project (or its raiser) really changes. The TTL is only a safety net.
+
+    A reader brackets its query with begin_read() / end_read() and passes the
+    version from begin_read() to set(): if an invalidation for that project
+    (any raiser's, or a clear) arrived while the query ran, the row it read
+    may be stale and is not cached. Versions are only kept for projects with
+    a read in flight.
+    """
+
+    def __init__(self, ttl=300, max_entries=MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # project id -> [reads in flight, invalidations seen since the first began]
+        self._reads = {}
+
+    def get(self, project_id):
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is None:
+                return None
+            value, raiser_id, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[project_id]
+                return None
+            self._entries.move_to_end(project_id)
+            return value
+
+    def begin_read(self, project_id):
+        with self._lock:
+            read = self._reads.setdefault(project_id, [0, 0])
+            read[0] += 1
+            return read[1]
+
+    def end_read(self, project_id):
+        with self._lock:
+            read = self._reads[project_id]
+            read[0] -= 1
+            if read[0] == 0:
+                del self._reads[project_id]
+
+    def set(self, project_id, raiser_id, value, version=None):
+        with self._lock:
+            if version is not None and (project_id not in self._reads or self._reads[project_id][1] != version):
+                return False
+            self._entries[project_id] = (value, raiser_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(project_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, project_id):
+        with self._lock:
+            if project_id in self._reads:
+                self._reads[project_id][1] += 1
+            self._entries.pop(project_id, None)
+
+    def invalidate_raiser(self, raiser_id):
+        with self._lock:
+            # The raiser of a project being queried is not known yet
+            for read in self._reads.values():
+                read[1] += 1
+            for project_id, entry in list(self._entries.items()):
+                if entry[1] == raiser_id:
+                    del self._entries[project_id]
+
+    def clear(self):
+        with self._lock:
+            for read in self._reads.values():
+                read[1] += 1
+            self._entries.clear()
+
+    def handle_change(self, event):
+        table = event.get("table")
+        if table == "*":
+            self.clear()
+        elif table == "project" and event.get("id") is not None:
+            self.invalidate(event["id"])
+        elif table == "raiser" and event.get("id") is not None:
+            self.invalidate_raiser(str(event["id"]))
+
+
+cache = ProjectDetailCache()
+
+
+def _build_payload(row):
+    return {
+        "id": row[0],
+        "name": row[1],
+        "token_name": row[2],
+        "token_symbol": row[3],
+        "logo_url": row[4],
+        "end_time": row[5],
+        "total_token_supply": row[7],
+        "funding_status": row[6],
+        "token_to_sell": row[8],
+        "token_price": float(row[9]),
+        "token_address": row[10],
+        "fund_raised": row[11],
+        "token_sold": row[12],
+        "description": row[19],
+        "decimal": row[13],
+        "vote_for_refund": row[14],
+        "x_link": row[15],
+        "website_link": row[16],
+        "telegram_link": row[17],
+        "whitepaper_link": row[18],
+        "raiser_name": row[20],
+        "raiser_username": row[21],
+        "like_count": row[22]
+    }
+
+
+def get_project_detail(cur, project_id):
+    """Shared project page payload (None if the project is not listed)"""
+    payload = cache.get(project_id)
+    if payload is not None:
+        return payload
+    version = cache.begin_read(project_id)
+    try:
+        cur.execute(DETAIL_SQL, (project_id,))
+        row = cur.fetchone()
+        if not row:
+            return None
+        payload = _build_payload(row)
+        cache.set(project_id, str(row[23]), payload, version)
+    finally:
+        cache.end_read(project_id)
+    return payload
+
+
+def init_app(app):
+    cache.ttl = float(os.getenv("PROJECT_CACHE_TTL", "300"))
+    change_listener.subscribe(cache.handle_change)
+    change_listener.init_app(app)
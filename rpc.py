@@ -0,0 +1,120 @@
+import itertools
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+DEFAULT_RPC_URL = "https://evm-rpc-arctic-1.sei-apis.com"
+MAX_BATCH_SIZE = 100
+
+
+class RPCError(Exception):
+    """Error object returned by the node for one JSON-RPC call"""
+
+    def __init__(self, method, error):
+        self.method = method
+        self.code = error.get("code") if isinstance(error, dict) else None
+        self.error_message = error.get("message") if isinstance(error, dict) else str(error)
+        super().__init__(f"{method}: {self.error_message} (code {self.code})")
+
+
+class RPCClient:
+    """JSON-RPC client over one pooled keep-alive HTTP session.
+
+    batch() sends many calls in a single POST (split every MAX_BATCH_SIZE
+    calls); web3 instances from this client share the same session so all
+    traffic of a process reuses the same connections.
+    """
+
+    def __init__(self, url, timeout=30, pool_size=10):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._ids = itertools.count(1)
+        self._web3 = None
+
+    def _post(self, payload):
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def call(self, method, params=None):
+        reply = self._post({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []})
+        if reply.get("error"):
+            raise RPCError(method, reply["error"])
+        return reply.get("result")
+
+    def batch(self, calls, raise_errors=True):
+        """Results of [(method, params), ...] in order, MAX_BATCH_SIZE calls per POST.
+
+        With raise_errors=False a failed call yields its RPCError in place of
+        the result instead of raising.
+        """
+        results = []
+        for start in range(0, len(calls), MAX_BATCH_SIZE):
+            chunk = calls[start:start + MAX_BATCH_SIZE]
+            ids = [next(self._ids) for _ in chunk]
+            payload = [
+                {"jsonrpc": "2.0", "id": call_id, "method": method, "params": params or []}
+                for call_id, (method, params) in zip(ids, chunk)
+            ]
+            reply = self._post(payload)
+            if isinstance(reply, dict):
+                # Some nodes answer a whole rejected batch with a single error
+                raise RPCError("batch", reply.get("error", reply))
+            by_id = {item.get("id"): item for item in reply}
+            for call_id, (method, _) in zip(ids, chunk):
+                item = by_id.get(call_id, {"error": {"message": "missing from batch response"}})
+                if item.get("error") or "result" not in item:
+                    error = RPCError(method, item.get("error"))
+                    if raise_errors:
+                        raise error
+                    results.append(error)
+                else:
+                    results.append(item["result"])
+        return results
+
+    def web3(self):
+        """Web3 instance sending through this client's session"""
+        if self._web3 is None:
+            self._web3 = Web3(Web3.HTTPProvider(self.url, request_kwargs={"timeout": self.timeout},
+                                                session=self.session))
+        return self._web3
+
+
+def to_int(value):
+    """Quantity from a JSON-RPC result ("0x..." hex string)"""
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """This process' shared client (a new one after a fork)"""
+    global _client
+    if _client is not None and _client.pid == os.getpid():
+        return _client
+    with _client_lock:
+        if _client is None or _client.pid != os.getpid():
+            client = RPCClient(
+                os.getenv("RPC_URL", DEFAULT_RPC_URL),
+                timeout=float(os.getenv("RPC_TIMEOUT", "30")),
+                pool_size=int(os.getenv("RPC_POOL_SIZE", "10"))
+            )
+            client.pid = os.getpid()
+            _client = client
+    return _client
+
+
+def get_web3():
+    return get_client().web3()
+
+
+def batch(calls, raise_errors=True):
+    return get_client().batch(calls, raise_errors)
@@ -2,9 +2,19 @@ import os
 import json
 import time
 import psycopg2
+from psycopg2.extras import execute_values
+import requests
+from hexbytes import HexBytes
 from web3 import Web3
+from websockets.sync.client import connect as ws_connect
+import rpc
+import log_decoder
 from dotenv import load_dotenv
 import datetime
+import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv(dotenv_path="config.env")
 DB_HOST = os.getenv("DB_HOST")
@@ -13,49 +23,34 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
-RPC_URL = "https://evm-rpc-arctic-1.sei-apis.com"
-CONTRACT_ADDRESS = Web3.to_checksum_address("0x392cd2aeb4a903c74e718b1ed96add7f02881bf6")
+WS_RPC_URL = os.getenv("WS_RPC_URL")
+CONTRACT_ADDRESS = Web3.to_checksum_address(os.getenv("OPENFUND_CONTRACT_ADDRESS", "0x392cd2aeb4a903c74e718b1ed96add7f02881bf6"))
 BLOCK_FILE = "last_processed_block.json"
+CHECKPOINT_NAME = "transaction_scanner"
 POLL_INTERVAL = 0.5
+# Subscription mode: how often the checkpoint is advanced with a gap-fill
+# scan while no logs arrive, and how long to poll before resubscribing.
+GAP_FILL_INTERVAL = 60
+RESUBSCRIBE_DELAY = 30
+BLOCK_CACHE_SIZE = 10000
+CHUNK_SIZE = 1999
+MIN_CHUNK_SIZE = 10
+MAX_CHUNK_SIZE = int(os.getenv("SCANNER_MAX_CHUNK_SIZE", "10000"))
+# A range is grown while it returns fewer logs than this, faster than
+# FAST_RANGE_SECONDS, and halved when it returns more or is slower than
+# SLOW_RANGE_SECONDS.
+TARGET_LOGS_PER_RANGE = 2000
+FAST_RANGE_SECONDS = 2.0
+SLOW_RANGE_SECONDS = 10.0
+# Provider errors meaning "ask for a smaller range"
+RANGE_ERROR_HINTS = ("too many", "limit exceeded", "exceeds", "response size", "block range",
+                     "more than", "timeout", "timed out")
+BACKFILL_WORKERS = int(os.getenv("SCANNER_BACKFILL_WORKERS", "4"))
 
-EVENT_SIGNATURES = {
-    "InvestmentMade": "InvestmentMade(uint256,address,uint256,uint256)",
-    "VoteCast": "VoteCast(uint256,address)",
-    "Refunded": "Refunded(uint256,address,uint256)"
-}
+SCANNED_EVENTS = ("InvestmentMade", "VoteCast", "Refunded")
 
-CONTRACT_ABI = [
-    {
-        "anonymous": False,
-        "inputs": [
-            {"indexed": True, "internalType": "uint256", "name": "projectId", "type": "uint256"},
-            {"indexed": True, "internalType": "address", "name": "investor", "type": "address"},
-            {"indexed": False, "internalType": "uint256", "name": "amount", "type": "uint256"},
-            {"indexed": False, "internalType": "uint256", "name": "tokensToReceive", "type": "uint256"}
-        ],
-        "name": "InvestmentMade",
-        "type": "event"
-    },
-    {
-        "anonymous": False,
-        "inputs": [
-            {"indexed": True, "internalType": "uint256", "name": "projectId", "type": "uint256"},
-            {"indexed": True, "internalType": "address", "name": "voter", "type": "address"}
-        ],
-        "name": "VoteCast",
-        "type": "event"
-    },
-    {
-        "anonymous": False,
-        "inputs": [
-            {"indexed": True, "internalType": "uint256", "name": "projectId", "type": "uint256"},
-            {"indexed": True, "internalType": "address", "name": "investor", "type": "address"},
-            {"indexed": False, "internalType": "uint256", "name": "amount", "type": "uint256"}
-        ],
-        "name": "Refunded",
-        "type": "event"
-    }
-]
+# topic0 of each scanned OpenFund event, so one eth_getLogs call can ask for all of them
+EVENT_TOPICS = {log_decoder.topic0(name): name for name in SCANNED_EVENTS}
 
 
 def get_db_connection():
@@ -74,8 +69,8 @@ def get_db_connection():
         return None
 
 
-def get_last_processed_block():
-    """Get the last processed block from the JSON file"""
+def get_legacy_last_block():
+    """Last block recorded in the JSON file used before the checkpoint table existed"""
     try:
         if os.path.exists(BLOCK_FILE):
             with open(BLOCK_FILE, 'r') as f:
@@ -88,215 +83,452 @@ def get_last_processed_block():
         return 0
 
 
-def save_last_processed_block(block_number):
-    """Save the last processed block to the JSON file"""
-    try:
-        with open(BLOCK_FILE, 'w') as f:
-            json.dump({'last_block': block_number}, f)
-        print(f"Saved last processed block: {block_number}")
-    except Exception as e:
-        print(f"Error saving last processed block: {e}")
+def get_last_processed_block(conn):
+    """Get the last processed block from scanner_checkpoint"""
+    cur = conn.cursor()
+    cur.execute("SELECT last_block FROM scanner_checkpoint WHERE name = %s", (CHECKPOINT_NAME,))
+    row = cur.fetchone()
+    conn.rollback()
+    cur.close()
+    if row:
+        return row[0]
+    return get_legacy_last_block()
 
-def process_investment_made_event(web3, event):
-    """Process InvestmentMade event and insert into database"""
-    try:
-        project_id = event['args']['projectId']
-        investor_address = event['args']['investor']
-        amount = event['args']['amount']
-        tokens_received = event['args']['tokensToReceive']
-        transaction_hash = event['transactionHash'].hex()
-        
-        tx_receipt = web3.eth.get_transaction_receipt(transaction_hash)
-        block = web3.eth.get_block(tx_receipt['blockNumber'])
-        transaction_time = datetime.datetime.fromtimestamp(block['timestamp'])
-        
-        amount_decimal = amount / 10**6
-        
-        conn = get_db_connection()
-        if not conn:
-            return False
-        
+
+class ChunkSizer:
+    """Block range size for eth_getLogs, learned from how the RPC responds.
+
+    Grows by half while ranges come back small and fast, halves on dense or
+    slow ranges and on range errors. Only the eth_getLogs call itself is
+    timed. Every change is logged and counted in grown / shrunk; the size is
+    stored with the checkpoint.
+    """
+
+    def __init__(self, size=CHUNK_SIZE):
+        self.size = size
+        self.loaded = False
+        self.grown = 0
+        self.shrunk = 0
+
+    def load(self, conn):
         cur = conn.cursor()
-        
-        cur.execute("SELECT id FROM investor WHERE wallet_address = %s", (investor_address.lower(),))
-        result = cur.fetchone()
-        if not result:
-            cur.execute("INSERT INTO investor(wallet_address) VALUES (%s)", (investor_address.lower(),))
-            conn.commit()
-        
-        cur.execute(
-            """
-            INSERT INTO transaction(project_id, investor_address, amount, token_received, transaction_time, transaction_hash, type)
-            VALUES (%s, %s, %s, %s, %s, %s, 'investment')
-            """,
-            (project_id, investor_address.lower(), amount_decimal, tokens_received, transaction_time, transaction_hash)
-        )
-        
-        conn.commit()
+        cur.execute("SELECT chunk_size FROM scanner_checkpoint WHERE name = %s", (CHECKPOINT_NAME,))
+        row = cur.fetchone()
+        conn.rollback()
         cur.close()
-        conn.close()
-        
-        print(f"Processed InvestmentMade: Project {project_id}, Investor {investor_address}, Amount {amount_decimal}, Tokens {tokens_received}, Hash {transaction_hash[:10]}...")
+        if row and row[0]:
+            self.size = min(max(row[0], MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+            print(f"Range size {self.size} (learned, from the checkpoint)")
+        self.loaded = True
+
+    def record(self, log_count, elapsed):
+        """Adjust the size after a full-size eth_getLogs call that returned
+        log_count logs in elapsed seconds"""
+        if log_count > TARGET_LOGS_PER_RANGE or elapsed > SLOW_RANGE_SECONDS:
+            self.shrink(f"{log_count} logs in {elapsed:.1f}s")
+        elif log_count < TARGET_LOGS_PER_RANGE // 2 and elapsed < FAST_RANGE_SECONDS:
+            self.resize(min(MAX_CHUNK_SIZE, self.size + self.size // 2), f"{log_count} logs in {elapsed:.1f}s")
+
+    def shrink(self, reason):
+        self.resize(max(MIN_CHUNK_SIZE, self.size // 2), reason)
+
+    def resize(self, size, reason):
+        if size == self.size:
+            return
+        if size > self.size:
+            self.grown += 1
+        else:
+            self.shrunk += 1
+        print(f"Range size {self.size} -> {size} ({reason})")
+        self.size = size
+
+
+chunk_sizer = ChunkSizer()
+
+
+class RangeTooLarge(Exception):
+    """eth_getLogs rejected a block range, or timed out on it"""
+
+
+def is_range_error(error):
+    """True if an error from eth_getLogs means the block range is too large.
+
+    Only meaningful for the eth_getLogs call itself: a timeout anywhere else
+    (block timestamps, a slow node) says nothing about the range.
+    """
+    if isinstance(error, requests.exceptions.Timeout):
         return True
-    
-    except Exception as e:
-        print(f"Error processing InvestmentMade event: {e}")
-        if 'conn' in locals() and conn:
-            conn.close()
-        return False
+    message = str(error).lower()
+    return any(hint in message for hint in RANGE_ERROR_HINTS)
+
+
+class BlockTimestampCache:
+    """LRU of block number -> block time, filled with batched eth_getBlockByNumber.
+
+    Shared by the backfill fetcher threads, hence the lock around the LRU.
+    """
+
+    def __init__(self, max_entries=BLOCK_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._times = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prefetch(self, block_numbers):
+        """Times of the given blocks, fetching all uncached ones in one JSON-RPC batch"""
+        wanted = set(block_numbers)
+        found = {}
+        with self._lock:
+            for n in wanted:
+                if n in self._times:
+                    self._times.move_to_end(n)
+                    found[n] = self._times[n]
+        missing = sorted(wanted - set(found))
+        if not missing:
+            return found
+        blocks = rpc.batch([("eth_getBlockByNumber", [hex(n), False]) for n in missing])
+        for n, block in zip(missing, blocks):
+            if not block:
+                raise ValueError(f"Block {n} not returned by RPC")
+            found[n] = datetime.datetime.fromtimestamp(rpc.to_int(block["timestamp"]))
+            self._put(n, found[n])
+        return found
+
+    def get(self, block_number):
+        return self.prefetch([block_number])[block_number]
+
+    def _put(self, block_number, block_time):
+        with self._lock:
+            self._times[block_number] = block_time
+            self._times.move_to_end(block_number)
+            while len(self._times) > self.max_entries:
+                self._times.popitem(last=False)
+
+
+block_times = BlockTimestampCache()
 
+# Only rows that were actually inserted come back, so a re-scanned log
+# neither duplicates the transaction nor counts twice in investor_position.
+# Rows ingested before log_index existed have it NULL, which the unique
+# constraint never matches, so an event already stored that way (same hash,
+# type, project and investor) is skipped explicitly.
+TRANSACTION_INSERT_SQL = """
+    INSERT INTO transaction(project_id, investor_address, amount, token_received, transaction_time, transaction_hash, type, log_index)
+    SELECT * FROM (VALUES %s) AS v(project_id, investor_address, amount, token_received, transaction_time, transaction_hash, type, log_index)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM transaction t
+        WHERE t.transaction_hash = v.transaction_hash
+        AND t.log_index IS NULL
+        AND t.type = v.type
+        AND t.project_id = v.project_id
+        AND t.investor_address = v.investor_address
+    )
+    ON CONFLICT (transaction_hash, log_index) DO NOTHING
+    RETURNING project_id, investor_address, amount, token_received, transaction_time, transaction_hash, type, log_index
+"""
+TRANSACTION_INSERT_TEMPLATE = "(%s::int, %s::varchar, %s::numeric, %s::numeric, %s::timestamp, %s::varchar, %s::varchar, %s::int)"
 
-def process_vote_cast_event(web3, event):
-    """Process VoteCast event and insert into database"""
+# The checkpoint only moves forward, and only over a range that starts right
+# after it, so a backfill of an older or detached range never skips blocks.
+CHECKPOINT_SQL = """
+    INSERT INTO scanner_checkpoint (name, last_block, chunk_size) VALUES (%(name)s, %(end_block)s, %(chunk_size)s)
+    ON CONFLICT (name) DO UPDATE
+    SET last_block = EXCLUDED.last_block,
+        chunk_size = COALESCE(EXCLUDED.chunk_size, scanner_checkpoint.chunk_size),
+        updated_time = CURRENT_TIMESTAMP
+    WHERE scanner_checkpoint.last_block >= %(start_block)s - 1
+    AND scanner_checkpoint.last_block < EXCLUDED.last_block
+"""
+
+INVESTOR_INSERT_SQL = """
+    INSERT INTO investor(wallet_address) VALUES %s
+    ON CONFLICT (wallet_address) DO NOTHING
+"""
+
+POSITION_UPSERT_SQL = """
+    INSERT INTO investor_position (investor_address, project_id, amount_invested, tokens_received,
+                                   amount_refunded, voted, refunded, last_activity_time)
+    VALUES %s
+    ON CONFLICT (investor_address, project_id) DO UPDATE
+    SET amount_invested = investor_position.amount_invested + EXCLUDED.amount_invested,
+        tokens_received = investor_position.tokens_received + EXCLUDED.tokens_received,
+        amount_refunded = investor_position.amount_refunded + EXCLUDED.amount_refunded,
+        voted = investor_position.voted OR EXCLUDED.voted,
+        refunded = investor_position.refunded OR EXCLUDED.refunded,
+        last_activity_time = GREATEST(investor_position.last_activity_time, EXCLUDED.last_activity_time)
+"""
+
+
+def investment_row(event, transaction_time):
+    """transaction row for an InvestmentMade event"""
+    return (
+        event.args['projectId'],
+        event.args['investor'].lower(),
+        event.args['amount'] / 10**6,
+        event.args['tokensToReceive'],
+        transaction_time,
+        event.transactionHash.hex(),
+        'investment',
+        event.logIndex
+    )
+
+
+def vote_row(event, transaction_time):
+    """transaction row for a VoteCast event"""
+    return (
+        event.args['projectId'],
+        event.args['voter'].lower(),
+        None,
+        None,
+        transaction_time,
+        event.transactionHash.hex(),
+        'vote',
+        event.logIndex
+    )
+
+
+def refund_row(event, transaction_time):
+    """transaction row for a Refunded event"""
+    return (
+        event.args['projectId'],
+        event.args['investor'].lower(),
+        event.args['amount'] / 10**6,
+        None,
+        transaction_time,
+        event.transactionHash.hex(),
+        'get_refund',
+        event.logIndex
+    )
+
+
+EVENT_ROWS = {
+    "InvestmentMade": investment_row,
+    "VoteCast": vote_row,
+    "Refunded": refund_row
+}
+
+
+def build_positions(rows):
+    """Fold transaction rows into one investor_position delta per (investor, project)"""
+    positions = {}
+    for project_id, investor_address, amount, tokens, transaction_time, _, tx_type, _ in rows:
+        position = positions.get((investor_address, project_id))
+        if position is None:
+            position = positions[(investor_address, project_id)] = [
+                investor_address, project_id, 0, 0, 0, False, False, transaction_time
+            ]
+        if tx_type == 'investment':
+            position[2] += amount
+            position[3] += tokens
+        elif tx_type == 'vote':
+            position[5] = True
+        else:
+            position[4] += amount
+            position[6] = True
+        position[7] = max(position[7], transaction_time)
+    # Sorted so concurrent writers lock position rows in the same order
+    return [tuple(position) for _, position in sorted(positions.items())]
+
+
+def write_chunk(conn, rows, start_block, end_block, chunk_size=None):
+    """Write the transaction rows of one block range and advance the checkpoint to
+    end_block (and the learned chunk_size), all in a single transaction.
+    With end_block None only the rows are written. Returns the rows actually
+    inserted."""
+    cur = conn.cursor()
     try:
-        project_id = event['args']['projectId']
-        voter_address = event['args']['voter']
-        transaction_hash = event['transactionHash'].hex()
-        
-        tx_receipt = web3.eth.get_transaction_receipt(transaction_hash)
-        block = web3.eth.get_block(tx_receipt['blockNumber'])
-        transaction_time = datetime.datetime.fromtimestamp(block['timestamp'])
-        
-        conn = get_db_connection()
-        if not conn:
-            return False
-        
-        cur = conn.cursor()
-        
-        cur.execute("SELECT id FROM investor WHERE wallet_address = %s", (voter_address.lower(),))
-        result = cur.fetchone()
-        if not result:
-            cur.execute("INSERT INTO investor(wallet_address) VALUES (%s)", (voter_address.lower(),))
-            conn.commit()
-        
-        cur.execute(
-            """
-            INSERT INTO transaction(project_id, investor_address, transaction_time, transaction_hash, type)
-            VALUES (%s, %s, %s, %s, 'vote')
-            """,
-            (project_id, voter_address.lower(), transaction_time, transaction_hash)
-        )
-        
+        inserted = []
+        if rows:
+            investors = sorted({row[1] for row in rows})
+            execute_values(cur, INVESTOR_INSERT_SQL, [(address,) for address in investors], page_size=1000)
+            inserted = execute_values(cur, TRANSACTION_INSERT_SQL, rows, template=TRANSACTION_INSERT_TEMPLATE,
+                                      page_size=1000, fetch=True)
+        if inserted:
+            execute_values(cur, POSITION_UPSERT_SQL, build_positions(inserted), page_size=1000)
+        if end_block is not None:
+            cur.execute(CHECKPOINT_SQL, {
+                "name": CHECKPOINT_NAME,
+                "start_block": start_block,
+                "end_block": end_block,
+                "chunk_size": chunk_size
+            })
         conn.commit()
+        return inserted
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
         cur.close()
-        conn.close()
-        
-        print(f"Processed VoteCast: Project {project_id}, Voter {voter_address}, Hash {transaction_hash[:10]}...")
-        return True
-    
+
+
+def get_chunk_events(web3, start_block, end_block):
+    """All OpenFund events in [start_block, end_block] from a single eth_getLogs call.
+
+    Returns (event_name, decoded_event) pairs in chain order. Raises
+    RangeTooLarge if the RPC rejects the range or times out on it.
+    """
+    try:
+        logs = web3.eth.get_logs({
+            "address": CONTRACT_ADDRESS,
+            "fromBlock": start_block,
+            "toBlock": end_block,
+            "topics": [list(EVENT_TOPICS)]
+        })
     except Exception as e:
-        print(f"Error processing VoteCast event: {e}")
-        if 'conn' in locals() and conn:
-            conn.close()
-        return False
+        if is_range_error(e):
+            raise RangeTooLarge(str(e) or type(e).__name__) from e
+        raise
+    return decode_logs(logs)
+
+
+def decode_logs(logs):
+    """(event_name, decoded_event) pairs for the OpenFund logs, in chain order"""
+    logs = sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex']))
+    
+    events = []
+    for log in logs:
+        event = log_decoder.decode_log(log, SCANNED_EVENTS)
+        if event is not None:
+            events.append((event.event, event))
+    return events
+
+
+def format_raw_log(raw):
+    """Log pushed by eth_subscribe (hex strings) in the shape eth_getLogs returns"""
+    return {
+        "address": Web3.to_checksum_address(raw["address"]),
+        "topics": [HexBytes(topic) for topic in raw["topics"]],
+        "data": HexBytes(raw["data"]),
+        "blockNumber": int(raw["blockNumber"], 16),
+        "blockHash": HexBytes(raw["blockHash"]),
+        "transactionHash": HexBytes(raw["transactionHash"]),
+        "transactionIndex": int(raw["transactionIndex"], 16),
+        "logIndex": int(raw["logIndex"], 16),
+        "removed": raw.get("removed", False)
+    }
+
+
+def event_rows(events):
+    """Timestamped transaction rows for decoded events"""
+    times = block_times.prefetch(event.blockNumber for _, event in events)
+    return [EVENT_ROWS[name](event, times[event.blockNumber]) for name, event in events]
+
+
+def fetch_chunk_rows(web3, start_block, end_block):
+    """Fetch, decode and timestamp the events of one block range (no DB access)"""
+    return event_rows(get_chunk_events(web3, start_block, end_block))
 
 
-def process_refund_event(web3, event):
-    """Process Refunded event and insert into database"""
+def fetch_range_rows(web3, start_block, end_block):
+    """fetch_chunk_rows(), bisecting the range when the RPC says it is too large"""
     try:
-        project_id = event['args']['projectId']
-        investor_address = event['args']['investor']
-        amount = event['args']['amount']
-        transaction_hash = event['transactionHash'].hex()
-        
-        tx_receipt = web3.eth.get_transaction_receipt(transaction_hash)
-        block = web3.eth.get_block(tx_receipt['blockNumber'])
-        transaction_time = datetime.datetime.fromtimestamp(block['timestamp'])
-        
-        amount_decimal = amount / 10**6
-        
-        conn = get_db_connection()
-        if not conn:
+        return fetch_chunk_rows(web3, start_block, end_block)
+    except RangeTooLarge:
+        if start_block == end_block:
+            raise
+        middle = (start_block + end_block) // 2
+        return (fetch_range_rows(web3, start_block, middle)
+                + fetch_range_rows(web3, middle + 1, end_block))
+
+
+def is_row_error(error):
+    """True if the database rejected the data itself (a bad value, a missing
+    project), so retrying the same rows can never succeed"""
+    return isinstance(error, (psycopg2.DataError, psycopg2.IntegrityError))
+
+
+def write_rows_skipping_rejected(conn, rows, rejected):
+    """Write rows in ever smaller batches, bisecting any batch the database
+    rejects; single rows it still rejects are logged, appended to rejected
+    and skipped. Returns the rows actually inserted."""
+    try:
+        return write_chunk(conn, rows, None, None)
+    except psycopg2.Error as e:
+        if not is_row_error(e):
+            raise
+        if len(rows) == 1:
+            print(f"Skipping event the database rejects: {rows[0]} ({' '.join(str(e).split())})")
+            rejected.append(rows[0])
+            return []
+    middle = len(rows) // 2
+    return (write_rows_skipping_rejected(conn, rows[:middle], rejected)
+            + write_rows_skipping_rejected(conn, rows[middle:], rejected))
+
+
+def commit_chunk(conn, rows, start_block, end_block, chunk_size=None):
+    """Write one fetched block range; False if the database rejected it.
+
+    If the range fails as a whole because of rows the database rejects, the
+    other rows are written on their own and the rejected ones skipped, so the
+    checkpoint still gets past them instead of retrying the range forever.
+    """
+    rejected = []
+    try:
+        inserted = write_chunk(conn, rows, start_block, end_block, chunk_size)
+    except psycopg2.Error as e:
+        if not rows or not is_row_error(e):
+            print(f"Database error writing block range {start_block}-{end_block}: {e}")
+            return False
+        print(f"Block range {start_block}-{end_block} rejected ({' '.join(str(e).split())}), "
+              f"writing it in smaller batches")
+        try:
+            # Already-inserted rows are skipped by ON CONFLICT, so a crash
+            # between these writes and the checkpoint only repeats work
+            inserted = write_rows_skipping_rejected(conn, rows, rejected)
+            write_chunk(conn, [], start_block, end_block, chunk_size)
+        except psycopg2.Error as e:
+            print(f"Database error writing block range {start_block}-{end_block}: {e}")
             return False
-        
-        cur = conn.cursor()
-        
-        cur.execute("SELECT id FROM investor WHERE wallet_address = %s", (investor_address.lower(),))
-        result = cur.fetchone()
-        if not result:
-            cur.execute("INSERT INTO investor(wallet_address) VALUES (%s)", (investor_address.lower(),))
-            conn.commit()
-        
-        cur.execute(
-            """
-            INSERT INTO transaction(project_id, investor_address, amount, transaction_time, transaction_hash, type)
-            VALUES (%s, %s, %s, %s, %s, 'get_refund')
-            """,
-            (project_id, investor_address.lower(), amount_decimal, transaction_time, transaction_hash)
-        )
-        
-        conn.commit()
-        cur.close()
-        conn.close()
-        
-        print(f"Processed Refunded: Project {project_id}, Investor {investor_address}, Amount {amount_decimal}, Hash {transaction_hash[:10]}...")
-        return True
     
-    except Exception as e:
-        print(f"Error processing Refunded event: {e}")
-        if 'conn' in locals() and conn:
-            conn.close()
-        return False
+    if rows:
+        counts = {tx_type: sum(1 for row in inserted if row[6] == tx_type) for tx_type in ('investment', 'vote', 'get_refund')}
+        print(f"Processed {counts['investment']} investments, {counts['vote']} votes, {counts['get_refund']} refunds in block range {start_block}-{end_block} ({len(rows) - len(inserted) - len(rejected)} already ingested, {len(rejected)} rejected)")
+    return True
+
 
 def scan_for_events():
     """Main function to scan for events and process them"""
     try:
-        web3 = Web3(Web3.HTTPProvider(RPC_URL))
+        web3 = rpc.get_web3()
         if not web3.is_connected():
             print("Web3 connection error")
             return
         
-        contract = web3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
-        
-        latest_block = web3.eth.block_number
-        last_processed_block = get_last_processed_block()
-        
-        if last_processed_block == 0:
-            last_processed_block = 0
-        
-        print(f"Scanning blocks from {last_processed_block + 1} to {latest_block}")
-        
-        chunk_size = 1999
-        start_block = last_processed_block + 1
+        conn = get_db_connection()
+        if not conn:
+            return None
         
-        while start_block <= latest_block:
-            end_block = min(start_block + chunk_size - 1, latest_block)
-            print(f"Processing chunk from block {start_block} to {end_block}")
-            
-            investment_filter = contract.events.InvestmentMade.create_filter(
-                fromBlock=start_block,
-                toBlock=end_block
-            )
-            
-            vote_filter = contract.events.VoteCast.create_filter(
-                fromBlock=start_block,
-                toBlock=end_block
-            )
-            
-            refund_filter = contract.events.Refunded.create_filter(
-                fromBlock=start_block,
-                toBlock=end_block
-            )
-            
-            investment_events = investment_filter.get_all_entries()
-            vote_events = vote_filter.get_all_entries()
-            refund_events = refund_filter.get_all_entries()
-            
-            for event in investment_events:
-                process_investment_made_event(web3, event)
-            
-            for event in vote_events:
-                process_vote_cast_event(web3, event)
-            
-            for event in refund_events:
-                process_refund_event(web3, event)
+        try:
+            latest_block = web3.eth.block_number
+            last_processed_block = get_last_processed_block(conn)
             
-            if investment_events or vote_events or refund_events:
-                print(f"Processed {len(investment_events)} investments, {len(vote_events)} votes, {len(refund_events)} refunds in block range {start_block}-{end_block}")
+            print(f"Scanning blocks from {last_processed_block + 1} to {latest_block}")
             
-            save_last_processed_block(end_block)
+            start_block = last_processed_block + 1
+            if not chunk_sizer.loaded:
+                chunk_sizer.load(conn)
             
-            start_block = end_block + 1
+            while start_block <= latest_block:
+                end_block = min(start_block + chunk_sizer.size - 1, latest_block)
+                print(f"Processing chunk from block {start_block} to {end_block} (range size {chunk_sizer.size})")
+                
+                started = time.monotonic()
+                try:
+                    events = get_chunk_events(web3, start_block, end_block)
+                except RangeTooLarge as e:
+                    if chunk_sizer.size == MIN_CHUNK_SIZE:
+                        raise
+                    chunk_sizer.shrink(f"range {start_block}-{end_block} too large: {e}")
+                    continue
+                if end_block - start_block + 1 == chunk_sizer.size:
+                    chunk_sizer.record(len(events), time.monotonic() - started)
+                rows = event_rows(events)
+                
+                if not commit_chunk(conn, rows, start_block, end_block, chunk_sizer.size):
+                    return None
+                
+                start_block = end_block + 1
+        finally:
+            conn.close()
         
         return latest_block
     
@@ -305,7 +537,272 @@ def scan_for_events():
         return None
 
 
+def backfill(from_block, to_block, workers=BACKFILL_WORKERS):
+    """Ingest [from_block, to_block] with parallel log fetchers.
+
+    Up to 2 * workers block ranges are fetched and decoded concurrently; they
+    are committed strictly in block order over one connection, so the
+    checkpoint advances exactly as in the sequential scan.
+    """
+    web3 = rpc.get_web3()
+    if not web3.is_connected():
+        print("Web3 connection error")
+        return False
+    
+    conn = get_db_connection()
+    if not conn:
+        return False
+    
+    # Ranges are fixed up front at the learned size; a range the RPC rejects
+    # is bisected by its fetcher instead.
+    try:
+        chunk_sizer.load(conn)
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        conn.close()
+        return False
+    size = chunk_sizer.size
+    ranges = [
+        (start_block, min(start_block + size - 1, to_block))
+        for start_block in range(from_block, to_block + 1, size)
+    ]
+    total_blocks = to_block - from_block + 1
+    done_blocks = 0
+    started = time.monotonic()
+    print(f"Backfilling blocks {from_block}-{to_block} ({len(ranges)} ranges, {workers} fetchers)")
+    
+    pending = deque()
+    next_range = iter(ranges)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                while True:
+                    while len(pending) < 2 * workers:
+                        block_range = next(next_range, None)
+                        if block_range is None:
+                            break
+                        pending.append((block_range, executor.submit(fetch_range_rows, web3, *block_range)))
+                    if not pending:
+                        break
+                    
+                    (start_block, end_block), future = pending.popleft()
+                    rows = future.result()
+                    if not commit_chunk(conn, rows, start_block, end_block):
+                        return False
+                    
+                    done_blocks += end_block - start_block + 1
+                    elapsed = time.monotonic() - started
+                    rate = done_blocks / elapsed if elapsed > 0 else 0
+                    eta = (total_blocks - done_blocks) / rate if rate > 0 else 0
+                    print(f"Backfill {done_blocks}/{total_blocks} blocks ({100 * done_blocks / total_blocks:.1f}%), "
+                          f"{rate:.0f} blocks/sec, ETA {datetime.timedelta(seconds=int(eta))}")
+            finally:
+                for _, queued in pending:
+                    queued.cancel()
+    except Exception as e:
+        print(f"Error backfilling blocks: {e}")
+        return False
+    finally:
+        conn.close()
+    return True
+
+
+REMOVED_LOG_DELETE_SQL = """
+    DELETE FROM transaction t
+    USING (VALUES %s) AS v(transaction_hash, log_index)
+    WHERE t.transaction_hash = v.transaction_hash
+    AND t.log_index = v.log_index
+    RETURNING t.investor_address, t.project_id
+"""
+
+# Same aggregation as the 005_investor_position backfill, for one position
+POSITION_RECOMPUTE_SQL = """
+    UPDATE investor_position ip
+    SET amount_invested = t.amount_invested,
+        tokens_received = t.tokens_received,
+        amount_refunded = t.amount_refunded,
+        voted = t.voted,
+        refunded = t.refunded,
+        last_activity_time = t.last_activity_time
+    FROM (
+        SELECT COALESCE(SUM(amount) FILTER (WHERE type = 'investment'), 0) AS amount_invested,
+               COALESCE(SUM(token_received) FILTER (WHERE type = 'investment'), 0) AS tokens_received,
+               COALESCE(SUM(amount) FILTER (WHERE type = 'get_refund'), 0) AS amount_refunded,
+               bool_or(type = 'vote') AS voted,
+               bool_or(type = 'get_refund') AS refunded,
+               MAX(transaction_time) AS last_activity_time
+        FROM transaction
+        WHERE investor_address = %(investor_address)s AND project_id = %(project_id)s
+        HAVING COUNT(*) > 0
+    ) t
+    WHERE ip.investor_address = %(investor_address)s AND ip.project_id = %(project_id)s
+"""
+
+POSITION_DELETE_EMPTY_SQL = """
+    DELETE FROM investor_position
+    WHERE investor_address = %(investor_address)s AND project_id = %(project_id)s
+    AND NOT EXISTS (
+        SELECT 1 FROM transaction
+        WHERE investor_address = %(investor_address)s AND project_id = %(project_id)s
+    )
+"""
+
+
+def remove_logs(conn, logs):
+    """Undo logs a reorg removed: delete their transaction rows and recompute
+    the positions they counted in. Returns the number of rows deleted."""
+    cur = conn.cursor()
+    try:
+        keys = [(log['transactionHash'].hex(), log['logIndex']) for log in logs]
+        deleted = execute_values(cur, REMOVED_LOG_DELETE_SQL, keys, template="(%s::varchar, %s::int)", fetch=True)
+        for investor_address, project_id in sorted(set(deleted)):
+            position = {"investor_address": investor_address, "project_id": project_id}
+            cur.execute(POSITION_RECOMPUTE_SQL, position)
+            cur.execute(POSITION_DELETE_EMPTY_SQL, position)
+        conn.commit()
+        return len(deleted)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def ingest_pushed_logs(conn, raw_logs, covered_from):
+    """Write a batch of logs pushed on the subscription, in arrival order.
+
+    covered_from is the first block the subscription is known to have pushed
+    every log of (the block after the gap-fill scan that followed
+    subscribing), so once a log of block N arrives every block from
+    covered_from to N - 1 is complete and the checkpoint moves there, even
+    when those blocks had no OpenFund logs. The newest block may still have
+    logs in flight, so the checkpoint stops before it. Logs flagged removed
+    (a reorg) are undone with remove_logs(). Returns False on a database
+    error.
+    """
+    # Runs of added / removed logs, so a log re-added after its removal (or
+    # removed after being added) in the same batch ends up right
+    runs = []
+    for raw in raw_logs:
+        if not raw:
+            continue
+        removed = bool(raw.get("removed"))
+        if not runs or runs[-1][0] != removed:
+            runs.append((removed, []))
+        runs[-1][1].append(format_raw_log(raw))
+    
+    for removed, logs in runs:
+        if removed:
+            try:
+                deleted = remove_logs(conn, logs)
+            except psycopg2.Error as e:
+                print(f"Database error removing {len(logs)} reorged logs: {e}")
+                return False
+            print(f"Reorg: {len(logs)} logs removed, {deleted} transaction rows deleted")
+            continue
+        rows = event_rows(decode_logs(logs))
+        last_block = max(log['blockNumber'] for log in logs)
+        if not commit_chunk(conn, rows, covered_from, last_block - 1):
+            return False
+    return True
+
+
+def receive_logs(ws, timeout):
+    """Raw logs pushed on the subscription: waits up to timeout for the first
+    one, then drains whatever else is already queued"""
+    logs = []
+    wait = timeout
+    while len(logs) < 1000:
+        try:
+            message = json.loads(ws.recv(timeout=wait))
+        except TimeoutError:
+            break
+        wait = 0
+        if message.get("method") == "eth_subscription":
+            logs.append(message["params"]["result"])
+    return logs
+
+
+def subscribe_for_events(ws_url):
+    """Push mode: ingest OpenFund logs as the node pushes them over eth_subscribe.
+
+    Every (re)subscription starts with a gap-fill scan from the checkpoint.
+    Pushed logs are then written as they arrive and move the checkpoint up to
+    the block before the newest one seen (see ingest_pushed_logs); the scan
+    is repeated every GAP_FILL_INTERVAL so the checkpoint also advances while
+    no logs arrive. The idempotent inserts make a log seen by both paths
+    harmless. Reorged logs are removed as the node reports them. While the
+    socket is down the scanner polls.
+    """
+    while True:
+        try:
+            with ws_connect(ws_url, open_timeout=10) as ws:
+                ws.send(json.dumps({
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "eth_subscribe",
+                    "params": ["logs", {"address": CONTRACT_ADDRESS, "topics": [list(EVENT_TOPICS)]}]
+                }))
+                reply = json.loads(ws.recv(timeout=10))
+                if "error" in reply:
+                    raise ValueError(reply["error"])
+                print(f"Subscribed to OpenFund logs on {ws_url} ({reply.get('result')})")
+                
+                # The subscription was live before this scan started, so every
+                # log after the block it reached will be pushed
+                scanned_to = scan_for_events()
+                if scanned_to is None:
+                    raise ValueError("gap-fill scan failed")
+                covered_from = scanned_to + 1
+                last_gap_fill = time.monotonic()
+                
+                conn = get_db_connection()
+                if not conn:
+                    raise ValueError("no database connection")
+                try:
+                    while True:
+                        raw_logs = receive_logs(ws, GAP_FILL_INTERVAL)
+                        if raw_logs and not ingest_pushed_logs(conn, raw_logs, covered_from):
+                            raise ValueError("database write failed")
+                        
+                        if time.monotonic() - last_gap_fill >= GAP_FILL_INTERVAL:
+                            scan_for_events()
+                            last_gap_fill = time.monotonic()
+                finally:
+                    conn.close()
+        
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            print(f"Log subscription error: {e}. Polling for {RESUBSCRIBE_DELAY} seconds before resubscribing...")
+            deadline = time.monotonic() + RESUBSCRIBE_DELAY
+            while time.monotonic() < deadline:
+                scan_for_events()
+                time.sleep(POLL_INTERVAL)
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--subscribe":
+        ws_url = sys.argv[2] if len(sys.argv) > 2 else WS_RPC_URL
+        if not ws_url:
+            print("Usage: python scanner_transaction_cronjob.py --subscribe WS_URL (or set WS_RPC_URL)")
+            sys.exit(2)
+        print("Starting blockchain event subscriber...")
+        try:
+            subscribe_for_events(ws_url)
+        except KeyboardInterrupt:
+            print("Process interrupted by user.")
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "--backfill":
+        if len(sys.argv) < 4:
+            print("Usage: python scanner_transaction_cronjob.py --backfill FROM TO [WORKERS]")
+            sys.exit(2)
+        workers = int(sys.argv[4]) if len(sys.argv) > 4 else BACKFILL_WORKERS
+        if not backfill(int(sys.argv[2]), int(sys.argv[3]), workers):
+            sys.exit(1)
+        return
+    
     print("Starting blockchain event listener...")
     
     while True:
@@ -325,4 +822,4 @@ def main():
             time.sleep(60)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,9 +1,14 @@
 import os
+import heapq
+import threading
 import time
 import psycopg2
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 from web3 import Web3
 from enum import IntEnum
+import rpc
+import change_listener
 
 class ProjectStatus(IntEnum):
     InitialCreated = 0
@@ -19,7 +24,6 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
-RPC_URL = "https://evm-rpc-arctic-1.sei-apis.com"
 CONTRACT_ADDRESS = Web3.to_checksum_address("0x392cd2aeb4a903c74e718b1ed96add7f02881bf6")
 
 CONTRACT_ABI = [
@@ -45,6 +49,33 @@ CONTRACT_ABI = [
 ]
 
 UPDATE_INTERVAL = 1
+# Unchanged projects are skipped, but every FULL_SYNC_INTERVAL seconds all
+# of them are sent again so rows edited behind the updater's back converge.
+FULL_SYNC_INTERVAL = 300
+# How often the set of active projects is re-read (it is also re-read when
+# an unknown project changes, e.g. on accept)
+ACTIVE_PROJECTS_REFRESH = 30
+
+# Polling schedule, in seconds. Each project is checked again after its
+# phase's interval, MAX_POLL_INTERVAL while its funding end is more than
+# FAR_DEADLINE away, every UPDATE_INTERVAL within DEADLINE_WINDOW of its
+# funding or voting end and for RECENT_ACTIVITY_WINDOW after the scanner
+# ingested one of its transactions, and never later than its next deadline.
+POLL_INTERVALS = {
+    'created': 30,
+    'raising': 15,
+    'voting': 5,
+    'failed': 60
+}
+MAX_POLL_INTERVAL = 120
+FAR_DEADLINE = 24 * 60 * 60
+DEADLINE_WINDOW = 5 * 60
+RECENT_ACTIVITY_WINDOW = 60
+VOTING_PERIOD = 3 * 24 * 60 * 60
+
+# getProjectDetails(uint256) is read with raw eth_calls, batched per cycle
+GET_PROJECT_DETAILS_SELECTOR = bytes(Web3.keccak(text="getProjectDetails(uint256)")[:4])
+PROJECT_DETAILS_TYPES = [output["type"] for output in CONTRACT_ABI[0]["outputs"]]
 
 
 def get_db_connection():
@@ -64,20 +95,20 @@ def get_db_connection():
 
 
 def get_active_projects():
-    """Get projects with raising or voting status"""
-    projects = []
+    """Get projects with raising or voting status (None on database error)"""
+    projects = None
     try:
         conn = get_db_connection()
         if not conn:
-            return []
+            return None
         
         cur = conn.cursor()
         cur.execute("""
-            SELECT id, funding_status 
+            SELECT id, funding_status, investment_end_time
             FROM project 
             WHERE funding_status IN ('raising', 'voting', 'created', 'failed') 
             AND listing_status = 'accepted'
-            AND extract(epoch from now()) < (investment_end_time + (4 * 24 * 60 * 60))
+            AND watch_until > floor(extract(epoch from now()))::bigint
         """)
         
         projects = cur.fetchall()
@@ -91,87 +122,262 @@ def get_active_projects():
     
     return projects
 
-def get_contract_project_details(web3, contract, project_id):
-    """Query the blockchain for project details"""
+def next_poll_interval(funding_status, investment_end_time, last_activity, now):
+    """Seconds until a project should be checked again (see POLL_INTERVALS)"""
+    interval = POLL_INTERVALS.get(funding_status, MAX_POLL_INTERVAL)
+    if funding_status in ('created', 'raising') and investment_end_time - now > FAR_DEADLINE:
+        interval = MAX_POLL_INTERVAL
+    if last_activity is not None and now - last_activity < RECENT_ACTIVITY_WINDOW:
+        interval = UPDATE_INTERVAL
+    for deadline in (investment_end_time, investment_end_time + VOTING_PERIOD):
+        until = deadline - now
+        if abs(until) <= DEADLINE_WINDOW:
+            interval = UPDATE_INTERVAL
+        elif until > 0:
+            interval = min(interval, until)
+    return max(interval, UPDATE_INTERVAL)
+
+
+class ProjectScheduler:
+    """Priority queue of active projects keyed by their next check time.
+
+    Change notifications arrive on the listener thread: a transaction the
+    scanner ingested makes its project due immediately, and a change to a
+    project the scheduler does not know yet asks for a refresh of the
+    active set. Either wakes the main loop.
+    """
+
+    def __init__(self):
+        self.projects = {}
+        self.last_activity = {}
+        self._due = {}
+        self._heap = []
+        self._refresh = True
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def sync(self, projects):
+        """Replace the active set with get_active_projects() rows; new projects are due now"""
+        now = time.time()
+        with self._lock:
+            self._refresh = False
+            active = {}
+            for project_id, funding_status, investment_end_time in projects:
+                active[project_id] = (funding_status, investment_end_time)
+                if project_id not in self._due:
+                    self._push(project_id, now)
+            for project_id in list(self._due):
+                if project_id not in active:
+                    del self._due[project_id]
+                    self.last_activity.pop(project_id, None)
+            self.projects = active
+
+    def _push(self, project_id, due):
+        self._due[project_id] = due
+        heapq.heappush(self._heap, (due, project_id))
+
+    def pop_due(self, now):
+        """Ids of the projects whose check time has come"""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                when, project_id = heapq.heappop(self._heap)
+                # Entries superseded by an earlier or later reschedule are stale
+                if self._due.get(project_id) == when:
+                    del self._due[project_id]
+                    due.append(project_id)
+        return due
+
+    def reschedule(self, project_id, funding_status, now):
+        with self._lock:
+            if project_id not in self.projects or project_id in self._due:
+                return
+            _, investment_end_time = self.projects[project_id]
+            self.projects[project_id] = (funding_status, investment_end_time)
+            interval = next_poll_interval(funding_status, investment_end_time,
+                                          self.last_activity.get(project_id), now)
+            self._push(project_id, now + interval)
+
+    def next_due(self):
+        with self._lock:
+            return min(self._due.values(), default=None)
+
+    def needs_refresh(self):
+        return self._refresh
+
+    def wait(self, timeout):
+        self._wakeup.wait(max(timeout, 0))
+        self._wakeup.clear()
+
+    def handle_change(self, event):
+        table = event.get("table")
+        now = time.time()
+        with self._lock:
+            if table == "transaction" and event.get("project_id") is not None:
+                project_id = event["project_id"]
+                if project_id not in self.projects:
+                    return
+                self.last_activity[project_id] = now
+                if self._due.get(project_id, now + 1) > now:
+                    self._push(project_id, now)
+            elif table == "project" and event.get("id") not in self.projects:
+                self._refresh = True
+            elif table == "*":
+                self._refresh = True
+                for project_id in self.projects:
+                    self._push(project_id, now)
+            else:
+                return
+        self._wakeup.set()
+
+
+def get_contract_projects_details(web3, project_ids):
+    """getProjectDetails() of every project, from one JSON-RPC batch of eth_calls.
+
+    All calls are pinned to the same block so a cycle sees one consistent
+    snapshot. Returns {project_id: details}; projects whose call failed are
+    left out.
+    """
+    if not project_ids:
+        return {}
     try:
-        return contract.functions.getProjectDetails(project_id).call()
+        block = hex(web3.eth.block_number)
+        results = rpc.batch([
+            ("eth_call", [{
+                "to": CONTRACT_ADDRESS,
+                "data": "0x" + (GET_PROJECT_DETAILS_SELECTOR + int(project_id).to_bytes(32, "big")).hex()
+            }, block])
+            for project_id in project_ids
+        ], raise_errors=False)
     except Exception as e:
         print(f"Error fetching project details from contract: {e}")
-        return None
+        return {}
+    
+    details = {}
+    for project_id, result in zip(project_ids, results):
+        try:
+            if isinstance(result, Exception):
+                raise result
+            details[project_id] = web3.codec.decode(PROJECT_DETAILS_TYPES, bytes.fromhex(result[2:]))
+        except Exception as e:
+            print(f"Error fetching details of project {project_id} from contract: {e}")
+    return details
+
+
+PROJECT_UPDATE_SQL = """
+    UPDATE project p
+    SET token_sold = v.token_sold,
+        fund_raised = v.fund_raised,
+        funding_status = v.funding_status,
+        vote_for_refund = v.vote_for_refund,
+        fund_claimed = v.fund_claimed
+    FROM (VALUES %s) AS v(id, token_sold, fund_raised, funding_status, vote_for_refund, fund_claimed)
+    WHERE p.id = v.id
+    AND (p.token_sold, p.fund_raised, p.funding_status, p.vote_for_refund, p.fund_claimed)
+        IS DISTINCT FROM (v.token_sold, v.fund_raised, v.funding_status, v.vote_for_refund, v.fund_claimed)
+"""
+PROJECT_UPDATE_TEMPLATE = "(%s::int, %s::bigint, %s::bigint, %s::varchar, %s::bigint, %s::boolean)"
+
+
+def db_funding_status(status):
+    """project.funding_status for an on-chain ProjectStatus"""
+    if status == ProjectStatus.VotingPeriod:
+        return 'voting'
+    if status == ProjectStatus.InitialCreated:
+        return 'created'
+    if status == ProjectStatus.FundingFailed:
+        return 'failed'
+    if status == ProjectStatus.FundingCompleted:
+        return 'completed'
+    return 'raising'
+
+
+def project_state(project_id, project_details):
+    """(id, token_sold, fund_raised, funding_status, vote_for_refund, fund_claimed) row from getProjectDetails()"""
+    _, _, _, tokens_sold, _, _, funds_raised, status, _, vote_for_refund, funds_claimed = project_details
+    return (project_id, tokens_sold, funds_raised / 10**6, db_funding_status(status), vote_for_refund, funds_claimed)
 
 
-def update_project_in_database(project_id, tokens_sold, funds_raised, status, vote_for_refund, funds_claimed):
-    """Update project information in the database"""
+def update_projects_in_database(states):
+    """Apply project_state() rows in one statement; returns the number of rows
+    that actually changed, or None on error. Rows already equal are not touched."""
+    conn = None
     try:
         conn = get_db_connection()
         if not conn:
-            return False
+            return None
         
         cur = conn.cursor()
-        
-        db_status = 'raising'
-        if status == ProjectStatus.VotingPeriod:
-            db_status = 'voting'
-        elif status == ProjectStatus.InitialCreated:
-            db_status = 'created'
-        elif status == ProjectStatus.FundingFailed:
-            db_status = 'failed'
-        elif status == ProjectStatus.FundingCompleted:
-            db_status = 'completed'
-        
-        cur.execute("""
-            UPDATE project 
-            SET token_sold = %s, 
-                fund_raised = %s, 
-                funding_status = %s,
-                vote_for_refund = %s,
-                fund_claimed = %s
-            WHERE id = %s
-        """, (tokens_sold, funds_raised, db_status, vote_for_refund, funds_claimed, project_id))
-        print(f"Project {project_id} updated successfully")
+        execute_values(cur, PROJECT_UPDATE_SQL, states, template=PROJECT_UPDATE_TEMPLATE, page_size=len(states))
+        updated = cur.rowcount
         conn.commit()
         cur.close()
         conn.close()
-        return True
+        return updated
     except psycopg2.Error as e:
         print(f"Database update error: {e}")
         if conn:
             conn.close()
-        return False
+        return None
 
 
 def main_loop():
     """Main processing loop"""
     
     try:
-        web3 = Web3(Web3.HTTPProvider(RPC_URL))
+        web3 = rpc.get_web3()
         if not web3.is_connected():
             return
-        
-        contract = web3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
     except Exception as e:
         print(f"Web3 connection error: {e}")
         return
     
+    scheduler = ProjectScheduler()
+    change_listener.subscribe(scheduler.handle_change)
+    change_listener.ensure_started()
+    
+    # Last on-chain state written per project, to skip unchanged ones
+    last_seen = {}
+    last_full_sync = time.monotonic()
+    last_refresh = 0
+    
     while True:
         try:
-            projects = get_active_projects()
+            if scheduler.needs_refresh() or time.monotonic() - last_refresh >= ACTIVE_PROJECTS_REFRESH:
+                projects = get_active_projects()
+                if projects is not None:
+                    scheduler.sync(projects)
+                last_refresh = time.monotonic()
+                for project_id in list(last_seen):
+                    if project_id not in scheduler.projects:
+                        del last_seen[project_id]
+            if time.monotonic() - last_full_sync >= FULL_SYNC_INTERVAL:
+                last_seen.clear()
+                last_full_sync = time.monotonic()
             
-            for project_id, current_status in projects:
-                project_details = get_contract_project_details(web3, contract, project_id)
+            now = time.time()
+            project_ids = scheduler.pop_due(now)
+            if project_ids:
+                projects_details = get_contract_projects_details(web3, project_ids)
+                states = [project_state(project_id, details) for project_id, details in projects_details.items()]
+                
+                changed = [state for state in states if last_seen.get(state[0]) != state]
+                if changed:
+                    updated = update_projects_in_database(changed)
+                    if updated is not None:
+                        last_seen.update((state[0], state) for state in changed)
+                        if updated:
+                            print(f"Updated {updated} of {len(project_ids)} checked projects ({len(changed)} sent)")
                 
-                if project_details:
-                    _, _, _, tokens_sold, _, _, funds_raised, status, _, vote_for_refund, funds_claimed = project_details
-                    update_project_in_database(
-                        project_id=project_id,
-                        tokens_sold=tokens_sold,
-                        funds_raised=funds_raised / 10**6,
-                        status=status,
-                        vote_for_refund=vote_for_refund,
-                        funds_claimed=funds_claimed
-                    )
+                # A project whose read failed keeps its last known phase
+                polled = {state[0]: state[3] for state in states}
+                for project_id in project_ids:
+                    current_status = scheduler.projects.get(project_id, (None, None))[0]
+                    scheduler.reschedule(project_id, polled.get(project_id, current_status), time.time())
             
-            time.sleep(UPDATE_INTERVAL)
+            next_due = scheduler.next_due()
+            timeout = ACTIVE_PROJECTS_REFRESH if next_due is None else next_due - time.time()
+            scheduler.wait(min(timeout, ACTIVE_PROJECTS_REFRESH))
             
         except Exception as e:
             print(f"Error in main loop: {e}")